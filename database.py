@@ -84,6 +84,8 @@ class Game(Base):
         Index('idx_game_date', 'date'),
         Index('idx_game_season', 'season'),
         Index('idx_game_teams', 'home_team_id', 'visitor_team_id'),
+        Index('idx_game_season_home', 'season', 'home_team_id'),
+        Index('idx_game_season_visitor', 'season', 'visitor_team_id'),
     )
 
 class GameStats(Base):
@@ -133,7 +135,7 @@ class GameStats(Base):
     __table_args__ = (
         Index('idx_stats_player', 'player_id'),
         Index('idx_stats_game', 'game_id'),
-        Index('idx_stats_player_game', 'player_id', 'game_id'),
+        Index('idx_stats_player_game', 'player_id', 'game_id', unique=True),
     )
 
 class AdvancedStats(Base):
@@ -290,3 +292,11 @@ class SyncLog(Base):
     __table_args__ = (
         Index('idx_sync_date', 'sync_date'),
     )
+
+class SyncState(Base):
+    """Per-endpoint sync bookkeeping shared by every process (last ETag, last sync time)"""
+    __tablename__ = "sync_state"
+    
+    endpoint = Column(String(50), primary_key=True)
+    etag = Column(String(200))
+    last_synced = Column(DateTime)
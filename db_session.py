@@ -3,6 +3,8 @@ Database connection and session management
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import os
@@ -28,12 +30,17 @@ if DATABASE_URL.startswith("sqlite"):
         poolclass=StaticPool
     )
 else:
-    # PostgreSQL for production (using psycopg3)
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    # PostgreSQL for production (using psycopg3).
+    # Batched INSERT ... RETURNING (ORM flushes of new rows) go out as multi-row VALUES
+    # pages of up to 10k rows; SQLAlchemy still caps each page at the bind-parameter limit
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True, insertmanyvalues_page_size=10_000)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Rows per INSERT ... ON CONFLICT statement
+UPSERT_BATCH_SIZE = 1000
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
@@ -59,3 +66,52 @@ def get_db_context():
         raise
     finally:
         db.close()
+
+def bulk_upsert(db: Session, table, rows, index_elements, update: bool = True,
+                batch_size: int = UPSERT_BATCH_SIZE):
+    """
+    Write row dicts with batched INSERT ... ON CONFLICT statements
+    Updates the non-key columns on conflict, or skips the row when update=False
+    """
+    if not rows:
+        return
+    
+    if db.get_bind().dialect.name == "postgresql":
+        insert = postgresql_insert
+    else:
+        insert = sqlite_insert
+    
+    update_columns = [name for name in rows[0] if name not in index_elements]
+    
+    for start in range(0, len(rows), batch_size):
+        stmt = insert(table).values(rows[start:start + batch_size])
+        if update and update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={name: stmt.excluded[name] for name in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        db.execute(stmt)
+
+def bulk_insert(db: Session, table, rows):
+    """
+    Insert new row dicts as fast as the backend allows
+    PostgreSQL streams them with COPY FROM STDIN; other databases use executemany
+    """
+    if not rows:
+        return
+    
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(table.insert(), rows)
+        return
+    
+    columns = list(rows[0])
+    copy_sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+    
+    # COPY runs on the session's own connection, so it commits/rolls back with the session
+    driver_connection = db.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(copy_sql) as copy:
+            for row in rows:
+                copy.write_row([row[column] for column in columns])
@@ -6,8 +6,46 @@ Includes: Teams, players, games, stats, advanced stats, injuries
 
 import asyncio
 from datetime import date, datetime
-from sync_service import DataSyncService
-from db_session import get_db_context, init_db
+from sync_service import DataSyncService, date_chunks, start_log_listener
+from db_session import engine, get_db_context, init_db
+
+# Weekly windows fetched concurrently during the backfill.
+# Kept small so parallel cursor walks stay under the GOAT tier 600 req/min cap.
+CHUNK_DAYS = 7
+MAX_CONCURRENT_CHUNKS = 4
+
+async def sync_in_chunks(label, sync_range, start_date, end_date):
+    """
+    Run a date-range sync over weekly chunks concurrently (one at a time on SQLite), each in its own session,
+    printing progress as each chunk finishes. The first failure cancels the other chunks
+    """
+    # SQLite sessions share one connection (StaticPool), so one chunk's commit or
+    # rollback would cover the others' writes: run the chunks one at a time
+    concurrency = 1 if engine.dialect.name == "sqlite" else MAX_CONCURRENT_CHUNKS
+    semaphore = asyncio.Semaphore(concurrency)
+    chunks = list(date_chunks(start_date, end_date, CHUNK_DAYS))
+    
+    async def run_chunk(chunk_start, chunk_end):
+        async with semaphore:
+            # A failed chunk rolls back only its own session
+            with get_db_context() as db:
+                count = await sync_range(db, chunk_start, chunk_end)
+            return chunk_start, chunk_end, count
+    
+    total = 0
+    tasks = [asyncio.create_task(run_chunk(chunk_start, chunk_end)) for chunk_start, chunk_end in chunks]
+    try:
+        for done, task in enumerate(asyncio.as_completed(tasks), 1):
+            chunk_start, chunk_end, count = await task
+            total += count or 0
+            print(f"   [{done}/{len(chunks)}] {label} {chunk_start} to {chunk_end}: {count}")
+    finally:
+        # Don't leave chunks running against the service once we stop waiting for them
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    return total
 
 async def initial_setup():
     """
@@ -20,67 +58,71 @@ async def initial_setup():
     init_db()
     print("✅ Database initialized with GOAT tier tables")
     
-    service = DataSyncService()
-    
-    with get_db_context() as db:
-        # 1. Sync teams (required first)
-        print("\n📋 Step 1/6: Syncing NBA teams...")
-        await service.sync_teams(db)
-        
-        # 2. Sync ACTIVE players (GOAT tier - faster than all players)
-        print("\n📋 Step 2/6: Syncing NBA active players...")
-        await service.sync_players(db)
-        
-        # 3. Sync games for current season
-        print("\n📋 Step 3/6: Syncing 2024-25 season games...")
-        print("This will take several minutes...")
-        
-        # Sync from November 2024 (season start) to today
-        start_date = date(2024, 11, 1)
-        end_date = date.today()
-        
-        games_synced = await service.sync_games_for_date_range(
-            db, 
-            start_date, 
-            end_date,
-            2024
-        )
-        
-        # 4. GOAT TIER: Sync advanced stats for same period
-        print("\n📋 Step 4/6: Syncing advanced stats (GOAT tier)...")
-        await service.sync_advanced_stats_for_date_range(
-            db,
-            start_date,
-            end_date,
-            2024
-        )
-        
-        # 5. GOAT TIER: Sync current injuries
-        print("\n📋 Step 5/6: Syncing player injuries (GOAT tier)...")
-        await service.sync_player_injuries(db)
-        
-        # 6. GOAT TIER: Sync betting odds for today
-        print("\n📋 Step 6/6: Syncing betting odds for today (GOAT tier)...")
-        try:
-            await service.sync_betting_odds_for_date(db, date.today())
-        except Exception as e:
-            print(f"⚠️  Could not sync odds (may not be available yet): {e}")
-        
-        print(f"\n✅ Initial setup complete!")
-        print(f"   Teams synced: ✓")
-        print(f"   Active players synced: ✓")
-        print(f"   Games synced: {games_synced}")
-        print(f"   Advanced stats synced: ✓")
-        print(f"   Injuries synced: ✓")
-        print(f"   Betting odds synced: ✓")
-        print(f"   Date range: {start_date} to {end_date}")
-        print("\n🎉 Your NBA Analytics system (GOAT Edition) is ready to use!")
-        print("=" * 60)
-        print("\n💡 Next steps:")
-        print("   1. Test API: curl http://localhost:8000/")
-        print("   2. Search players: curl 'http://localhost:8000/player/search?name=curry'")
-        print("   3. Advanced stats: curl 'http://localhost:8000/analytics/advanced-stats?player_name=Stephen+Curry&season=2024'")
-        print("   4. Set up daily sync to run automatically")
+    async with DataSyncService() as service:
+        with get_db_context() as db:
+            # 1. Sync teams (required first)
+            print("\n📋 Step 1/6: Syncing NBA teams...")
+            await service.sync_teams(db)
+            
+            # 2. Sync ACTIVE players (GOAT tier - faster than all players)
+            print("\n📋 Step 2/6: Syncing NBA active players...")
+            await service.sync_players(db)
+            
+            # 3. Sync games for current season
+            print("\n📋 Step 3/6: Syncing 2024-25 season games...")
+            print("This will take several minutes...")
+            
+            # Sync from November 2024 (season start) to today
+            start_date = date(2024, 11, 1)
+            end_date = date.today()
+            
+            games_synced = await sync_in_chunks(
+                "games",
+                lambda chunk_db, chunk_start, chunk_end: service.sync_games_for_date_range(
+                    chunk_db, chunk_start, chunk_end, 2024
+                ),
+                start_date,
+                end_date
+            )
+            
+            # 4. GOAT TIER: Sync advanced stats for same period
+            print("\n📋 Step 4/6: Syncing advanced stats (GOAT tier)...")
+            await sync_in_chunks(
+                "advanced stats",
+                lambda chunk_db, chunk_start, chunk_end: service.sync_advanced_stats_for_date_range(
+                    chunk_db, chunk_start, chunk_end, 2024
+                ),
+                start_date,
+                end_date
+            )
+            
+            # 5. GOAT TIER: Sync current injuries
+            print("\n📋 Step 5/6: Syncing player injuries (GOAT tier)...")
+            await service.sync_player_injuries(db)
+            
+            # 6. GOAT TIER: Sync betting odds for today
+            print("\n📋 Step 6/6: Syncing betting odds for today (GOAT tier)...")
+            try:
+                await service.sync_betting_odds_for_date(db, date.today())
+            except Exception as e:
+                print(f"⚠️  Could not sync odds (may not be available yet): {e}")
+            
+            print(f"\n✅ Initial setup complete!")
+            print(f"   Teams synced: ✓")
+            print(f"   Active players synced: ✓")
+            print(f"   Games synced: {games_synced}")
+            print(f"   Advanced stats synced: ✓")
+            print(f"   Injuries synced: ✓")
+            print(f"   Betting odds synced: ✓")
+            print(f"   Date range: {start_date} to {end_date}")
+            print("\n🎉 Your NBA Analytics system (GOAT Edition) is ready to use!")
+            print("=" * 60)
+            print("\n💡 Next steps:")
+            print("   1. Test API: curl http://localhost:8000/")
+            print("   2. Search players: curl 'http://localhost:8000/player/search?name=curry'")
+            print("   3. Advanced stats: curl 'http://localhost:8000/analytics/advanced-stats?player_name=Stephen+Curry&season=2024'")
+            print("   4. Set up daily sync to run automatically")
 
 if __name__ == "__main__":
+    start_log_listener()
     asyncio.run(initial_setup())
@@ -3,26 +3,163 @@ NBA Analytics Backend API - Enhanced Version with BallDontLie Relay
 Forwards requests to BallDontLie GOAT tier API for betting analytics
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Depends, Request, Header
+from fastapi import FastAPI, HTTPException, Query, Path, BackgroundTasks, Depends, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from collections import defaultdict
+from contextlib import asynccontextmanager, aclosing
+from functools import lru_cache
+from cachetools import LRUCache, TLRUCache, TTLCache
+import anyio
+import asyncio
 import httpx
+import orjson
 import os
 
 from database import Player, Team, Game, GameStats, MetricCache
 from db_session import init_db, get_db
-from sync_service import DataSyncService
+from sync_service import DataSyncService, SYNC_REQUESTS_PER_SECOND, start_log_listener
+from scheduler import start_scheduler
+from rate_limit import TokenBucket, backoff_delay, retry_delay, RETRYABLE_STATUS_CODES, RETRYABLE_TRANSPORT_ERRORS
+
+# BallDontLie API configuration
+BALLDONTLIE_API_KEY = os.getenv("BALLDONTLIE_API_KEY", "ecf3210d-b098-4e81-8f7c-57c3aa41be3b")
+BALLDONTLIE_BASE_URL = "https://api.balldontlie.io"
+
+# Worker threads for sync dependencies / DB sessions (anyio default is 40)
+THREADPOOL_TOKENS = 200
+
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+
+# Run the daily sync scheduler in this process (on by default for a single worker;
+# with several workers, disable it and run `python scheduler.py` once instead)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true" if WEB_CONCURRENCY == 1 else "false").lower() == "true"
+
+# Stay under the GOAT tier cap (600 req/min = 10/s) instead of waiting for 429s; 9/s leaves headroom.
+# An in-process daily sync draws from the relay's bucket; a standalone scheduler keeps its own
+# SYNC_REQUESTS_PER_SECOND, so the relay gets what's left. The relay budget is split across uvicorn workers.
+TOTAL_REQUESTS_PER_SECOND = 9
+BALLDONTLIE_REQUESTS_PER_SECOND = float(os.getenv(
+    "BALLDONTLIE_REQUESTS_PER_SECOND",
+    TOTAL_REQUESTS_PER_SECOND - (0 if SCHEDULER_ENABLED else SYNC_REQUESTS_PER_SECOND)
+))
+RATE_LIMIT_PER_SECOND = BALLDONTLIE_REQUESTS_PER_SECOND / WEB_CONCURRENCY
+RATE_LIMIT_BURST = max(1, 20 // WEB_CONCURRENCY)
+RELAY_ATTEMPTS = 3
+
+# Seconds between background BallDontLie connectivity checks for /health
+HEALTH_PING_INTERVAL = 30
+
+# Seconds between reloads of the in-memory teams list
+TEAMS_REFRESH_INTERVAL = 24 * 60 * 60
+
+# Optional Redis so all workers share cached relay responses
+REDIS_URL = os.getenv("REDIS_URL")
+
+async def ping_balldontlie(app: FastAPI):
+    """Check BallDontLie connectivity in the background so /health never calls upstream"""
+    while True:
+        try:
+            await app.state.rate_limiter.acquire()
+            response = await app.state.http.get("/v1/teams", params={"per_page": 1}, timeout=5.0)
+            response.raise_for_status()
+            app.state.balldontlie_status = "connected"
+        except Exception:
+            app.state.balldontlie_status = "error"
+        await asyncio.sleep(HEALTH_PING_INTERVAL)
+
+async def load_teams(app: FastAPI):
+    """Fetch every team page into memory (sorted by id) so team lookups skip the relay"""
+    teams = []
+    async for page in fetch_all("/v1/teams", {"per_page": 100}):
+        teams.extend(page.get("data", []))
+    teams.sort(key=lambda team: team["id"])
+    app.state.teams = teams
+    app.state.teams_by_id = {team["id"]: team for team in teams}
+
+async def refresh_teams(app: FastAPI):
+    """Reload the in-memory teams periodically so renames/relocations show up without a restart"""
+    while True:
+        await asyncio.sleep(TEAMS_REFRESH_INTERVAL)
+        try:
+            await load_teams(app)
+        except Exception as e:
+            print(f"⚠️ Could not refresh teams, keeping the loaded list: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database and the shared BallDontLie client"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    
+    init_db()
+    print("✅ Database initialized")
+    
+    # One pooled HTTP/2 client for every relay call (keeps TLS connections warm).
+    # Binding to 0.0.0.0 pins IPv4 so we never stall on an IPv6 fallback.
+    app.state.http = httpx.AsyncClient(
+        base_url=BALLDONTLIE_BASE_URL,
+        headers={"Authorization": BALLDONTLIE_API_KEY},
+        # Short pool timeout so a saturated pool fails fast with a 503 instead of hanging
+        timeout=httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0),
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=0,
+            local_address="0.0.0.0",
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=300)
+        )
+    )
+    app.state.rate_limiter = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+    print(f"✅ BallDontLie relay active (GOAT tier)")
+    
+    app.state.redis = None
+    if REDIS_URL:
+        import redis.asyncio as redis
+        app.state.redis = redis.from_url(REDIS_URL)
+        print("✅ Shared Redis relay cache enabled")
+    
+    # Teams almost never change; keep them in memory (reloaded daily) so team lookups skip the relay
+    app.state.teams = []
+    app.state.teams_by_id = {}
+    try:
+        await load_teams(app)
+        print(f"✅ Loaded {len(app.state.teams)} teams")
+    except Exception as e:
+        print(f"⚠️ Could not preload teams, relaying team lookups instead: {e}")
+    teams_task = asyncio.create_task(refresh_teams(app))
+    
+    app.state.balldontlie_status = "unknown"
+    health_task = asyncio.create_task(ping_balldontlie(app))
+    
+    # Daily sync shares this process's event loop, DB engine and BallDontLie request budget
+    scheduler = None
+    if SCHEDULER_ENABLED:
+        start_log_listener()
+        scheduler = start_scheduler(app.state.rate_limiter)
+    if scheduler:
+        print("✅ Daily sync scheduler running in-process")
+    
+    yield
+    
+    if scheduler:
+        scheduler.shutdown(wait=False)
+    health_task.cancel()
+    teams_task.cancel()
+    await app.state.http.aclose()
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
 
 app = FastAPI(
     title="NBA Analytics API - Enhanced with BallDontLie Relay", 
     version="2.1.0",
-    description="Betting analytics powered by BallDontLie GOAT tier API"
+    description="Betting analytics powered by BallDontLie GOAT tier API",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -34,57 +171,289 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# BallDontLie API configuration
-BALLDONTLIE_API_KEY = os.getenv("BALLDONTLIE_API_KEY", "ecf3210d-b098-4e81-8f7c-57c3aa41be3b")
-BALLDONTLIE_BASE_URL = "https://api.balldontlie.io"
-
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    init_db()
-    print("✅ Database initialized")
-    print(f"✅ BallDontLie relay active (GOAT tier)")
+# Compress larger JSON payloads (box scores, stats pages, the slate)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # === BALLDONTLIE RELAY ENDPOINTS ===
 
+# Relay cache TTLs in seconds, first matching path prefix wins (0 = never cache)
+CACHE_TTLS = [
+    ("/v1/box_scores/live", 0),
+    ("/v1/teams", 24 * 60 * 60),
+    ("/v1/players", 60 * 60),
+    ("/v1/season_averages", 60 * 60),
+    ("/v1/leaders", 60 * 60),
+    ("/v1/standings", 10 * 60),
+    ("/v1/stats", 2 * 60),
+    ("/v1/player_injuries", 60),
+    ("/v2/odds", 30),
+]
+DEFAULT_CACHE_TTL = 60
+CACHE_MAX_ENTRIES = 10_000
+
+def cache_ttl(path: str) -> int:
+    """Look up the cache TTL for an upstream path"""
+    for prefix, ttl in CACHE_TTLS:
+        if path.startswith(prefix):
+            return ttl
+    return DEFAULT_CACHE_TTL
+
+def cache_key(path: str, params: Optional[Dict[str, Any]]) -> tuple:
+    """Hashable cache key for an upstream request"""
+    return (path, tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items()
+    )))
+
+@lru_cache(maxsize=4096)
+def query_string(items: tuple) -> str:
+    """URL-encode a cache key's params once; list values expand to repeated keys"""
+    pairs = []
+    for name, value in items:
+        if isinstance(value, tuple):
+            pairs.extend((name, v) for v in value)
+        else:
+            pairs.append((name, value))
+    return str(httpx.QueryParams(pairs))
+
+# Upstream caching headers passed through to our clients on relayed responses
+RELAYED_HEADERS = ("etag", "cache-control", "last-modified")
+
+# (raw upstream body, relayed headers, ttl) per request, each entry expiring after its own TTL
+RESPONSE_CACHE = TLRUCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttu=lambda key, value, now: now + value[2]
+)
+# Last body and relayed headers (ETag / Last-Modified) per request, kept past expiry for conditional GETs
+VALIDATOR_CACHE = LRUCache(maxsize=CACHE_MAX_ENTRIES)
+# Requests that recently 404'd upstream (unknown ids), answered locally for 5 minutes
+NOT_FOUND_CACHE = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=300)
+
+def parse_cache_control(header: str) -> Dict[str, str]:
+    """Split a Cache-Control header into {directive: value}"""
+    directives = {}
+    for part in header.split(","):
+        name, _, value = part.strip().lower().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+    return directives
+
+def upstream_ttl(response: httpx.Response, ttl: int) -> int:
+    """
+    Our TTL for a path, shortened to a positive upstream max-age.
+    no-cache/no-store/max-age=0 keep our TTL: the local cache is what keeps us under the rate limit
+    """
+    directives = parse_cache_control(response.headers.get("cache-control", ""))
+    max_age = directives.get("max-age", "")
+    if max_age.isdigit() and int(max_age) > 0:
+        return min(ttl, int(max_age))
+    return ttl
+
+def shared_cache_name(key: tuple) -> str:
+    """Redis key for a relay cache key"""
+    return f"bdl:{key[0]}?{query_string(key[1])}"
+
+async def shared_cache_get(key: tuple) -> Optional[Tuple[bytes, Dict[str, str], int]]:
+    """(body, relayed headers, remaining ttl) from Redis, or None if disabled, missing or unreachable"""
+    if app.state.redis is None:
+        return None
+    
+    name = shared_cache_name(key)
+    try:
+        async with app.state.redis.pipeline(transaction=False) as pipe:
+            value, ttl = await pipe.get(name).ttl(name).execute()
+    except Exception as e:
+        print(f"⚠️ Redis cache read failed: {e}")
+        return None
+    
+    if value is None or ttl <= 0:
+        return None
+    
+    # Stored as <headers json>\n<body>
+    headers, body = value.split(b"\n", 1)
+    return body, orjson.loads(headers), ttl
+
+async def shared_cache_set(key: tuple, body: bytes, headers: Dict[str, str], ttl: int):
+    """Store a relay response in Redis for the other workers"""
+    if app.state.redis is None:
+        return
+    
+    try:
+        await app.state.redis.set(shared_cache_name(key), orjson.dumps(headers) + b"\n" + body, ex=ttl)
+    except Exception as e:
+        print(f"⚠️ Redis cache write failed: {e}")
+
+# Upstream fetches currently in flight, so concurrent identical requests share one call
+INFLIGHT: Dict[tuple, asyncio.Future] = {}
+
 async def forward_to_balldontlie(path: str, params: Dict[str, Any] = None) -> Dict:
     """
     Forward requests to BallDontLie API with GOAT tier authentication
     """
-    url = f"{BALLDONTLIE_BASE_URL}{path}"
-    headers = {"Authorization": BALLDONTLIE_API_KEY}
+    body, _ = await relay_body(path, params)
+    return orjson.loads(body)
+
+async def forward_raw(path: str, params: Dict[str, Any] = None) -> Response:
+    """
+    Forward requests to BallDontLie and pass the JSON body through untouched
+    (no decode/re-encode for endpoints that don't read the payload)
+    """
+    body, headers = await relay_body(path, params)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def fetch_all(path: str, params: Dict[str, Any] = None, max_pages: int = 10):
+    """
+    Yield every page of a cursor-paginated BallDontLie endpoint,
+    requesting the next page while the caller handles the current one
+    """
+    params = dict(params or {})
+    fetch = asyncio.ensure_future(forward_to_balldontlie(path, params))
+    try:
+        for page_number in range(1, max_pages + 1):
+            page = await fetch
+            next_cursor = (page.get("meta") or {}).get("next_cursor")
+            if next_cursor and page_number < max_pages:
+                fetch = asyncio.ensure_future(forward_to_balldontlie(path, {**params, "cursor": next_cursor}))
+            else:
+                fetch = None
+            
+            yield page
+            
+            if fetch is None:
+                return
+    finally:
+        if fetch is not None and not fetch.done():
+            fetch.cancel()
+
+async def relay_body(path: str, params: Optional[Dict[str, Any]]) -> Tuple[bytes, Dict[str, str]]:
+    """Raw upstream body and caching headers for a request, served from cache or a shared in-flight fetch"""
+    key = cache_key(path, params)
+    if key in NOT_FOUND_CACHE:
+        raise HTTPException(status_code=404, detail=f"Endpoint not found: {path}")
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(url, headers=headers, params=params or {})
+    ttl = cache_ttl(path)
+    if ttl:
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached[0], cached[1]
+    
+    fetch = INFLIGHT.get(key)
+    if fetch is None:
+        fetch = asyncio.ensure_future(fetch_from_balldontlie(path, key, ttl))
+        INFLIGHT[key] = fetch
+        fetch.add_done_callback(lambda _: INFLIGHT.pop(key, None))
+    
+    # Shielded so one caller disconnecting doesn't cancel the fetch for the others
+    return await asyncio.shield(fetch)
+
+async def fetch_from_balldontlie(path: str, key: tuple, ttl: int) -> Tuple[bytes, Dict[str, str]]:
+    """Make the upstream call and return the raw body, revalidating with ETag / Last-Modified when we have one"""
+    # Another worker may already have fetched it
+    if ttl:
+        shared = await shared_cache_get(key)
+        if shared is not None:
+            RESPONSE_CACHE[key] = shared
+            return shared[0], shared[1]
+    
+    try:
+        headers = {}
+        validator = VALIDATOR_CACHE.get(key)
+        if validator:
+            if "etag" in validator[1]:
+                headers["If-None-Match"] = validator[1]["etag"]
+            if "last-modified" in validator[1]:
+                headers["If-Modified-Since"] = validator[1]["last-modified"]
+        
+        query = query_string(key[1])
+        url = f"{path}?{query}" if query else path
+        
+        # Retry connection flaps and 429/5xx gateway errors with jittered backoff
+        # (or the upstream Retry-After) before giving up
+        for attempt in range(1, RELAY_ATTEMPTS + 1):
+            await app.state.rate_limiter.acquire()
+            try:
+                response = await app.state.http.get(url, headers=headers)
+            except RETRYABLE_TRANSPORT_ERRORS:
+                if attempt == RELAY_ATTEMPTS:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == RELAY_ATTEMPTS:
+                break
+            await asyncio.sleep(retry_delay(response.headers, attempt))
+        
+        relayed = {name: response.headers[name] for name in RELAYED_HEADERS if name in response.headers}
+        if response.status_code == 304 and validator:
+            body = validator[0]
+            relayed = {**validator[1], **relayed}
+        else:
             response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                raise HTTPException(
-                    status_code=401, 
-                    detail="BallDontLie API authentication failed. Check GOAT tier subscription."
-                )
-            elif e.response.status_code == 429:
-                raise HTTPException(
-                    status_code=429,
-                    detail="Rate limit exceeded. GOAT tier = 600 req/min. Wait briefly."
-                )
-            elif e.response.status_code == 404:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Endpoint not found: {path}"
-                )
-            else:
-                raise HTTPException(
-                    status_code=e.response.status_code,
-                    detail=f"BallDontLie API error: {e.response.text}"
-                )
-        except Exception as e:
+            body = response.content
+        
+        if ("etag" in relayed or "last-modified" in relayed) and "no-store" not in relayed.get("cache-control", ""):
+            VALIDATOR_CACHE[key] = (body, relayed)
+        
+        ttl = upstream_ttl(response, ttl) if ttl else 0
+        if ttl:
+            RESPONSE_CACHE[key] = (body, relayed, ttl)
+            await shared_cache_set(key, body, relayed, ttl)
+        return body, relayed
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            raise HTTPException(
+                status_code=401, 
+                detail="BallDontLie API authentication failed. Check GOAT tier subscription."
+            )
+        elif e.response.status_code == 429:
             raise HTTPException(
-                status_code=500,
-                detail=f"Error connecting to BallDontLie API: {str(e)}"
+                status_code=429,
+                detail="Rate limit exceeded. GOAT tier = 600 req/min. Wait briefly."
             )
+        elif e.response.status_code == 404:
+            NOT_FOUND_CACHE[key] = True
+            raise HTTPException(
+                status_code=404,
+                detail=f"Endpoint not found: {path}"
+            )
+        else:
+            raise HTTPException(
+                status_code=e.response.status_code,
+                detail=f"BallDontLie API error: {e.response.text}"
+            )
+    except httpx.PoolTimeout:
+        raise HTTPException(
+            status_code=503,
+            detail="BallDontLie relay is saturated. Retry shortly."
+        )
+    except httpx.TimeoutException as e:
+        raise HTTPException(
+            status_code=504,
+            detail=f"BallDontLie API timed out: {type(e).__name__}"
+        )
+    except httpx.TransportError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Could not reach BallDontLie API: {type(e).__name__}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error connecting to BallDontLie API: {str(e)}"
+        )
+
+def upstream_params(**filters) -> Dict[str, Any]:
+    """
+    Build BallDontLie query params from endpoint arguments, dropping unset filters.
+    List values are sent as BallDontLie's array params (team_ids -> team_ids[]).
+    """
+    params = {}
+    for name, value in filters.items():
+        if value is None or value == "" or value == []:
+            continue
+        if isinstance(value, list):
+            name = f"{name}[]"
+        params[name] = value
+    return params
 
 # === NBA V1 ENDPOINTS (Core Data) ===
 
@@ -95,21 +464,43 @@ async def get_teams(
     cursor: Optional[str] = None,
     per_page: int = Query(25, le=100)
 ):
-    """Get all NBA teams"""
-    params = {"per_page": per_page}
-    if conference:
-        params["conference"] = conference
-    if division:
-        params["division"] = division
-    if cursor:
-        params["cursor"] = cursor
+    """
+    Get all NBA teams
+    Served from the preloaded list with upstream-style cursor paging
+    (next_cursor is the last team id returned; pass it back as cursor for the next page)
+    """
+    if app.state.teams and (cursor is None or cursor.isdigit()):
+        teams = app.state.teams
+        if conference:
+            teams = [t for t in teams if (t.get("conference") or "").lower() == conference.lower()]
+        if division:
+            teams = [t for t in teams if (t.get("division") or "").lower() == division.lower()]
+        if cursor:
+            teams = [t for t in teams if t["id"] > int(cursor)]
+        
+        page = teams[:per_page]
+        meta = {"per_page": per_page}
+        if len(teams) > per_page:
+            meta["next_cursor"] = page[-1]["id"]
+        return {"data": page, "meta": meta}
     
-    return await forward_to_balldontlie("/v1/teams", params)
+    params = upstream_params(
+        per_page=per_page,
+        conference=conference,
+        division=division,
+        cursor=cursor
+    )
+    
+    return await forward_raw("/v1/teams", params)
 
 @app.get("/api/v1/teams/{team_id}")
-async def get_team(team_id: int):
+async def get_team(team_id: int = Path(..., gt=0)):
     """Get specific team by ID"""
-    return await forward_to_balldontlie(f"/v1/teams/{team_id}")
+    team = app.state.teams_by_id.get(team_id)
+    if team is not None:
+        return {"data": team}
+    
+    return await forward_raw(f"/v1/teams/{team_id}")
 
 @app.get("/api/v1/players/active")
 async def get_active_players(
@@ -125,21 +516,17 @@ async def get_active_players(
     Get ACTIVE NBA players only (current rosters)
     ⚠️ USE THIS ENDPOINT FOR BETTING ANALYSIS - Only returns active players
     """
-    params = {"per_page": per_page}
-    if search:
-        params["search"] = search
-    if first_name:
-        params["first_name"] = first_name
-    if last_name:
-        params["last_name"] = last_name
-    if team_ids:
-        params["team_ids[]"] = team_ids
-    if player_ids:
-        params["player_ids[]"] = player_ids
-    if cursor:
-        params["cursor"] = cursor
-    
-    return await forward_to_balldontlie("/v1/players/active", params)
+    params = upstream_params(
+        per_page=per_page,
+        search=search,
+        first_name=first_name,
+        last_name=last_name,
+        team_ids=team_ids,
+        player_ids=player_ids,
+        cursor=cursor
+    )
+    
+    return await forward_raw("/v1/players/active", params)
 
 @app.get("/api/v1/players")
 async def get_players(
@@ -156,26 +543,22 @@ async def get_players(
     ⚠️ WARNING: This returns ALL players including inactive/retired
     ⚠️ For betting analysis, use /api/v1/players/active instead
     """
-    params = {"per_page": per_page}
-    if search:
-        params["search"] = search
-    if first_name:
-        params["first_name"] = first_name
-    if last_name:
-        params["last_name"] = last_name
-    if team_ids:
-        params["team_ids[]"] = team_ids
-    if player_ids:
-        params["player_ids[]"] = player_ids
-    if cursor:
-        params["cursor"] = cursor
-    
-    return await forward_to_balldontlie("/v1/players", params)
+    params = upstream_params(
+        per_page=per_page,
+        search=search,
+        first_name=first_name,
+        last_name=last_name,
+        team_ids=team_ids,
+        player_ids=player_ids,
+        cursor=cursor
+    )
+    
+    return await forward_raw("/v1/players", params)
 
 @app.get("/api/v1/players/{player_id}")
-async def get_player(player_id: int):
+async def get_player(player_id: int = Path(..., gt=0)):
     """Get specific player by ID"""
-    return await forward_to_balldontlie(f"/v1/players/{player_id}")
+    return await forward_raw(f"/v1/players/{player_id}")
 
 @app.get("/api/v1/games")
 async def get_games(
@@ -189,28 +572,23 @@ async def get_games(
     per_page: int = Query(25, le=100)
 ):
     """Get NBA games with filters"""
-    params = {"per_page": per_page}
-    if dates:
-        params["dates[]"] = dates
-    if start_date:
-        params["start_date"] = start_date
-    if end_date:
-        params["end_date"] = end_date
-    if seasons:
-        params["seasons[]"] = seasons
-    if postseason is not None:
-        params["postseason"] = postseason
-    if team_ids:
-        params["team_ids[]"] = team_ids
-    if cursor:
-        params["cursor"] = cursor
-    
-    return await forward_to_balldontlie("/v1/games", params)
+    params = upstream_params(
+        per_page=per_page,
+        dates=dates,
+        start_date=start_date,
+        end_date=end_date,
+        seasons=seasons,
+        postseason=postseason,
+        team_ids=team_ids,
+        cursor=cursor
+    )
+    
+    return await forward_raw("/v1/games", params)
 
 @app.get("/api/v1/games/{game_id}")
-async def get_game(game_id: int):
+async def get_game(game_id: int = Path(..., gt=0)):
     """Get specific game by ID"""
-    return await forward_to_balldontlie(f"/v1/games/{game_id}")
+    return await forward_raw(f"/v1/games/{game_id}")
 
 @app.get("/api/v1/stats")
 async def get_stats(
@@ -226,27 +604,20 @@ async def get_stats(
     per_page: int = Query(25, le=100)
 ):
     """Get player game statistics"""
-    params = {"per_page": per_page}
-    if player_ids:
-        params["player_ids[]"] = player_ids
-    if game_ids:
-        params["game_ids[]"] = game_ids
-    if team_ids:
-        params["team_ids[]"] = team_ids
-    if dates:
-        params["dates[]"] = dates
-    if seasons:
-        params["seasons[]"] = seasons
-    if start_date:
-        params["start_date"] = start_date
-    if end_date:
-        params["end_date"] = end_date
-    if postseason is not None:
-        params["postseason"] = postseason
-    if cursor:
-        params["cursor"] = cursor
-    
-    return await forward_to_balldontlie("/v1/stats", params)
+    params = upstream_params(
+        per_page=per_page,
+        player_ids=player_ids,
+        game_ids=game_ids,
+        team_ids=team_ids,
+        dates=dates,
+        seasons=seasons,
+        start_date=start_date,
+        end_date=end_date,
+        postseason=postseason,
+        cursor=cursor
+    )
+    
+    return await forward_raw("/v1/stats", params)
 
 @app.get("/api/v1/stats/advanced")
 async def get_advanced_stats(
@@ -261,28 +632,38 @@ async def get_advanced_stats(
     per_page: int = Query(25, le=100)
 ):
     """Get advanced statistics (GOAT tier)"""
-    params = {"per_page": per_page}
-    if player_ids:
-        params["player_ids[]"] = player_ids
-    if game_ids:
-        params["game_ids[]"] = game_ids
-    if dates:
-        params["dates[]"] = dates
-    if seasons:
-        params["seasons[]"] = seasons
-    if start_date:
-        params["start_date"] = start_date
-    if end_date:
-        params["end_date"] = end_date
-    if postseason is not None:
-        params["postseason"] = postseason
-    if cursor:
-        params["cursor"] = cursor
-    
-    return await forward_to_balldontlie("/v1/stats/advanced", params)
+    params = upstream_params(
+        per_page=per_page,
+        player_ids=player_ids,
+        game_ids=game_ids,
+        dates=dates,
+        seasons=seasons,
+        start_date=start_date,
+        end_date=end_date,
+        postseason=postseason,
+        cursor=cursor
+    )
+    
+    return await forward_raw("/v1/stats/advanced", params)
 
 # === GOAT TIER ENDPOINTS ===
 
+# Season average types by category (ordered for error messages)
+SEASON_AVERAGE_TYPES = {
+    "general": ("base", "advanced", "usage", "scoring", "defense", "misc"),
+    "shooting": ("5ft_range", "by_zone"),
+    "defense": ("2_pointers", "3_pointers", "greater_than_15ft", "less_than_10ft", "less_than_6ft", "overall"),
+    "clutch": ("base", "advanced", "usage", "scoring", "misc")
+}
+VALID_CATEGORIES = frozenset(SEASON_AVERAGE_TYPES)
+VALID_CATEGORIES_TEXT = ", ".join(SEASON_AVERAGE_TYPES)
+VALID_CATEGORY_TYPES = {category: frozenset(types) for category, types in SEASON_AVERAGE_TYPES.items()}
+VALID_CATEGORY_TYPES_TEXT = {category: ", ".join(types) for category, types in SEASON_AVERAGE_TYPES.items()}
+
+LEADER_STAT_TYPES = ("reb", "dreb", "tov", "ast", "oreb", "min", "pts", "stl", "blk")
+VALID_STAT_TYPES = frozenset(LEADER_STAT_TYPES)
+VALID_STAT_TYPES_TEXT = ", ".join(LEADER_STAT_TYPES)
+
 @app.get("/api/v1/season_averages/{category}")
 async def get_season_averages(
     category: str,
@@ -307,39 +688,29 @@ async def get_season_averages(
     Example: /api/v1/season_averages/general?season=2024&type=base
     """
     # Validate category
-    valid_categories = ["general", "shooting", "defense", "clutch"]
-    if category not in valid_categories:
+    if category not in VALID_CATEGORIES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid category. Must be one of: {', '.join(valid_categories)}"
+            detail=f"Invalid category. Must be one of: {VALID_CATEGORIES_TEXT}"
         )
     
     # Validate type for category
-    category_types = {
-        "general": ["base", "advanced", "usage", "scoring", "defense", "misc"],
-        "clutch": ["base", "advanced", "usage", "scoring", "misc"],
-        "defense": ["2_pointers", "3_pointers", "greater_than_15ft", "less_than_10ft", "less_than_6ft", "overall"],
-        "shooting": ["5ft_range", "by_zone"]
-    }
-    
-    if type not in category_types.get(category, []):
+    if type not in VALID_CATEGORY_TYPES[category]:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid type '{type}' for category '{category}'. Valid types: {', '.join(category_types[category])}"
+            detail=f"Invalid type '{type}' for category '{category}'. Valid types: {VALID_CATEGORY_TYPES_TEXT[category]}"
         )
     
-    params = {
-        "season": season,
-        "season_type": season_type,
-        "type": type,
-        "per_page": per_page
-    }
-    if player_ids:
-        params["player_ids[]"] = player_ids
-    if cursor:
-        params["cursor"] = cursor
+    params = upstream_params(
+        season=season,
+        season_type=season_type,
+        type=type,
+        per_page=per_page,
+        player_ids=player_ids,
+        cursor=cursor
+    )
     
-    return await forward_to_balldontlie(f"/v1/season_averages/{category}", params)
+    return await forward_raw(f"/v1/season_averages/{category}", params)
 
 @app.get("/api/v1/leaders")
 async def get_leaders(
@@ -353,22 +724,20 @@ async def get_leaders(
     
     Valid stat_types: reb, dreb, tov, ast, oreb, min, pts, stl, blk
     """
-    valid_stat_types = ["reb", "dreb", "tov", "ast", "oreb", "min", "pts", "stl", "blk"]
-    if stat_type not in valid_stat_types:
+    if stat_type not in VALID_STAT_TYPES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid stat_type. Must be one of: {', '.join(valid_stat_types)}"
+            detail=f"Invalid stat_type. Must be one of: {VALID_STAT_TYPES_TEXT}"
         )
     
-    params = {
-        "stat_type": stat_type,
-        "season": season,
-        "per_page": per_page
-    }
-    if cursor:
-        params["cursor"] = cursor
+    params = upstream_params(
+        stat_type=stat_type,
+        season=season,
+        per_page=per_page,
+        cursor=cursor
+    )
     
-    return await forward_to_balldontlie("/v1/leaders", params)
+    return await forward_raw("/v1/leaders", params)
 
 @app.get("/api/v1/standings")
 async def get_standings(
@@ -376,7 +745,7 @@ async def get_standings(
 ):
     """Get NBA standings (GOAT tier only)"""
     params = {"season": season}
-    return await forward_to_balldontlie("/v1/standings", params)
+    return await forward_raw("/v1/standings", params)
 
 @app.get("/api/v1/player_injuries")
 async def get_injuries(
@@ -386,15 +755,14 @@ async def get_injuries(
     per_page: int = Query(25, le=100)
 ):
     """Get injury reports (GOAT tier only)"""
-    params = {"per_page": per_page}
-    if team_ids:
-        params["team_ids[]"] = team_ids
-    if player_ids:
-        params["player_ids[]"] = player_ids
-    if cursor:
-        params["cursor"] = cursor
+    params = upstream_params(
+        per_page=per_page,
+        team_ids=team_ids,
+        player_ids=player_ids,
+        cursor=cursor
+    )
     
-    return await forward_to_balldontlie("/v1/player_injuries", params)
+    return await forward_raw("/v1/player_injuries", params)
 
 @app.get("/api/v1/box_scores")
 async def get_box_scores(
@@ -402,12 +770,12 @@ async def get_box_scores(
 ):
     """Get box scores for a specific date (GOAT tier only)"""
     params = {"date": date}
-    return await forward_to_balldontlie("/v1/box_scores", params)
+    return await forward_raw("/v1/box_scores", params)
 
 @app.get("/api/v1/box_scores/live")
 async def get_live_box_scores():
     """Get live box scores for today (GOAT tier only)"""
-    return await forward_to_balldontlie("/v1/box_scores/live")
+    return await forward_raw("/v1/box_scores/live")
 
 # === NBA V2 ENDPOINTS (Betting Odds) ===
 
@@ -432,20 +800,21 @@ async def get_odds(
             detail="At least one of 'dates' or 'game_ids' must be provided"
         )
     
-    params = {"per_page": per_page}
-    if dates:
-        params["dates[]"] = dates
-    if game_ids:
-        params["game_ids[]"] = game_ids
-    if vendor:
-        params["vendor"] = vendor
-    if cursor:
-        params["cursor"] = cursor
+    params = upstream_params(
+        per_page=per_page,
+        dates=dates,
+        game_ids=game_ids,
+        vendor=vendor,
+        cursor=cursor
+    )
     
-    return await forward_to_balldontlie("/v2/odds", params)
+    return await forward_raw("/v2/odds", params)
 
 # === CUSTOM BETTING ANALYTICS ENDPOINTS ===
 
+# Prop analyses by (player_id, stat, threshold, games); UIs re-poll the same props constantly
+PROP_CACHE = TTLCache(maxsize=4096, ttl=60)
+
 @app.get("/api/betting/todays-slate")
 async def get_todays_betting_slate():
     """
@@ -454,40 +823,50 @@ async def get_todays_betting_slate():
     """
     today = date.today().isoformat()
     
-    # Get today's games
-    games_data = await forward_to_balldontlie("/v1/games", {"dates[]": [today]})
+    games = []
+    odds_by_game = defaultdict(list)
+    injuries_by_team = defaultdict(list)
     
-    # Get odds
-    try:
-        odds_data = await forward_to_balldontlie("/v2/odds", {"dates[]": [today]})
-    except:
-        odds_data = {"data": []}
+    # Walk every page (not just the first) and group odds by game, injuries by team as pages arrive
+    async def load_games():
+        async for page in fetch_all("/v1/games", {"dates[]": [today], "per_page": 100}):
+            games.extend(page.get("data", []))
     
-    # Get injuries
-    try:
-        injuries_data = await forward_to_balldontlie("/v1/player_injuries", {})
-    except:
-        injuries_data = {"data": []}
+    async def load_odds():
+        async for page in fetch_all("/v2/odds", {"dates[]": [today], "per_page": 100}):
+            for odds in page.get("data", []):
+                odds_by_game[odds.get("game_id")].append(odds)
+    
+    async def load_injuries():
+        async for page in fetch_all("/v1/player_injuries", {"per_page": 100}):
+            for inj in page.get("data", []):
+                injuries_by_team[inj.get("player", {}).get("team_id")].append(inj)
+    
+    # Get today's games, odds and injuries concurrently
+    games_result, odds_result, injuries_result = await asyncio.gather(
+        load_games(), load_odds(), load_injuries(),
+        return_exceptions=True
+    )
+    
+    # Games are required; odds and injuries are best-effort (all or nothing)
+    if isinstance(games_result, Exception):
+        raise games_result
+    if isinstance(odds_result, Exception):
+        odds_by_game.clear()
+    if isinstance(injuries_result, Exception):
+        injuries_by_team.clear()
     
     # Combine data
     slate = []
-    for game in games_data.get("data", []):
-        game_info = {
-            "game": game,
-            "odds": [o for o in odds_data.get("data", []) if o.get("game_id") == game["id"]],
-            "injuries": []
-        }
-        
-        # Filter injuries for this game's teams
+    for game in games:
         home_id = game.get("home_team", {}).get("id")
         visitor_id = game.get("visitor_team", {}).get("id")
         
-        for inj in injuries_data.get("data", []):
-            player_team_id = inj.get("player", {}).get("team_id")
-            if player_team_id in [home_id, visitor_id]:
-                game_info["injuries"].append(inj)
-        
-        slate.append(game_info)
+        slate.append({
+            "game": game,
+            "odds": odds_by_game.get(game["id"], []),
+            "injuries": injuries_by_team.get(home_id, []) + injuries_by_team.get(visitor_id, [])
+        })
     
     return {
         "date": today,
@@ -497,7 +876,7 @@ async def get_todays_betting_slate():
 
 @app.get("/api/betting/player-prop-analysis")
 async def analyze_player_prop(
-    player_id: int,
+    player_id: int = Query(..., gt=0),
     stat: str = "pts",
     threshold: float = 25.5,
     games: int = 15
@@ -506,43 +885,140 @@ async def analyze_player_prop(
     Analyze player prop probability
     Returns hit rate for over/under based on recent games
     """
-    # Get player info
-    player_data = await forward_to_balldontlie(f"/v1/players/{player_id}")
+    key = (player_id, stat, threshold, games)
+    cached = PROP_CACHE.get(key)
+    if cached is not None:
+        return cached
     
-    # Get recent stats
-    stats_data = await forward_to_balldontlie("/v1/stats", {
-        "player_ids[]": [player_id],
-        "seasons[]": [2024],
-        "per_page": games
-    })
+    # Player info and recent stats are independent, fetch both at once
+    player_data, stats_data = await asyncio.gather(
+        forward_to_balldontlie(f"/v1/players/{player_id}"),
+        forward_to_balldontlie("/v1/stats", {
+            "player_ids[]": [player_id],
+            "seasons[]": [2024],
+            "per_page": games
+        })
+    )
     
     # Calculate hit rates
     recent_games = stats_data.get("data", [])[:games]
     if not recent_games:
         raise HTTPException(status_code=404, detail="No recent games found")
     
-    hits = sum(1 for g in recent_games if g.get(stat, 0) >= threshold)
-    hit_rate = (hits / len(recent_games)) * 100
+    result = summarize_prop(player_data["data"], recent_games, stat, threshold)
+    PROP_CACHE[key] = result
+    return result
+
+class PropRequest(BaseModel):
+    """One prop in a batch analysis request"""
+    player_id: int = Field(..., gt=0)
+    stat: str = "pts"
+    threshold: float = 25.5
+    games: int = Field(15, gt=0, le=82)
+
+# Props per batch request (player lookups go out in a single per_page=100 call)
+MAX_PROP_BATCH = 50
+
+@app.post("/api/betting/player-props")
+async def analyze_player_props(props: List[PropRequest]):
+    """
+    Analyze many player props at once
+    Looks up all players in one call and walks one shared stats query,
+    instead of two upstream calls per prop
+    """
+    if len(props) > MAX_PROP_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_PROP_BATCH} props per request"
+        )
+    
+    results = [PROP_CACHE.get((p.player_id, p.stat, p.threshold, p.games)) for p in props]
+    pending = [p for p, result in zip(props, results) if result is None]
+    
+    if pending:
+        # Most games needed per player, so we can stop paging once everyone has enough
+        games_needed = {}
+        for p in pending:
+            games_needed[p.player_id] = max(games_needed.get(p.player_id, 0), p.games)
+        player_ids = list(games_needed)
+        
+        # Pages interleave the players' games, so allow enough for everyone to reach the largest ask
+        max_pages = -(-len(player_ids) * max(games_needed.values()) // 100)
+        
+        async def load_stats():
+            stats_by_player = defaultdict(list)
+            truncated = False
+            # aclosing stops fetch_all's prefetched page as soon as we break out
+            pages = fetch_all("/v1/stats", {"player_ids[]": player_ids, "seasons[]": [2024], "per_page": 100}, max_pages=max_pages)
+            async with aclosing(pages):
+                async for page in pages:
+                    for row in page.get("data", []):
+                        stats_by_player[row.get("player", {}).get("id")].append(row)
+                    if all(len(stats_by_player[pid]) >= needed for pid, needed in games_needed.items()):
+                        break
+                    truncated = bool((page.get("meta") or {}).get("next_cursor"))
+            return stats_by_player, truncated
+        
+        players_data, (stats_by_player, truncated) = await asyncio.gather(
+            forward_to_balldontlie("/v1/players", {"player_ids[]": player_ids, "per_page": 100}),
+            load_stats()
+        )
+        players_by_id = {player["id"]: player for player in players_data.get("data", [])}
+        
+        for index, p in enumerate(props):
+            if results[index] is not None:
+                continue
+            
+            player = players_by_id.get(p.player_id)
+            recent_games = stats_by_player.get(p.player_id, [])[:p.games]
+            if player is None:
+                results[index] = {"player_id": p.player_id, "error": "Player not found"}
+            elif not recent_games:
+                results[index] = {"player_id": p.player_id, "error": "No recent games found"}
+                if truncated:
+                    results[index]["truncated"] = True
+            elif truncated and len(recent_games) < p.games:
+                # Paging stopped before this player had enough games; flag it and don't cache it
+                results[index] = {**summarize_prop(player, recent_games, p.stat, p.threshold), "truncated": True}
+            else:
+                results[index] = summarize_prop(player, recent_games, p.stat, p.threshold)
+                PROP_CACHE[(p.player_id, p.stat, p.threshold, p.games)] = results[index]
     
-    # Home/away split
-    home_games = [g for g in recent_games if g.get("game", {}).get("home_team_id") == player_data["data"]["team"]["id"]]
-    away_games = [g for g in recent_games if g.get("game", {}).get("home_team_id") != player_data["data"]["team"]["id"]]
+    return {"props": results}
+
+def summarize_prop(player: Dict, recent_games: List[Dict], stat: str, threshold: float) -> Dict:
+    """Hit rates, home/away split and recommendation for one prop over a player's recent games"""
+    # Hits, home/away split and total in a single pass with running counters
+    team_id = player["team"]["id"]
+    hits = home_games = home_hits = away_games = away_hits = 0
+    total = 0
     
-    home_hits = sum(1 for g in home_games if g.get(stat, 0) >= threshold)
-    away_hits = sum(1 for g in away_games if g.get(stat, 0) >= threshold)
+    for g in recent_games:
+        value = g.get(stat, 0)
+        hit = value >= threshold
+        total += value
+        hits += hit
+        if g.get("game", {}).get("home_team_id") == team_id:
+            home_games += 1
+            home_hits += hit
+        else:
+            away_games += 1
+            away_hits += hit
+    
+    hit_rate = (hits / len(recent_games)) * 100
     
     return {
-        "player": player_data["data"],
+        "player": player,
         "prop": f"{stat} over {threshold}",
         "analysis": {
             "games_analyzed": len(recent_games),
             "overall_hit_rate": round(hit_rate, 1),
             "hits": hits,
             "misses": len(recent_games) - hits,
-            "home_hit_rate": round((home_hits / len(home_games)) * 100, 1) if home_games else 0,
-            "away_hit_rate": round((away_hits / len(away_games)) * 100, 1) if away_games else 0,
+            "home_hit_rate": round((home_hits / home_games) * 100, 1) if home_games else 0,
+            "away_hit_rate": round((away_hits / away_games) * 100, 1) if away_games else 0,
             "recent_values": [g.get(stat, 0) for g in recent_games[:5]],
-            "average_value": round(sum(g.get(stat, 0) for g in recent_games) / len(recent_games), 1)
+            "average_value": round(total / len(recent_games), 1)
         },
         "recommendation": "VALUE" if hit_rate > 60 else "AVOID" if hit_rate < 40 else "NEUTRAL"
     }
@@ -581,21 +1057,23 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check with BallDontLie connectivity"""
-    try:
-        # Test BallDontLie connection
-        await forward_to_balldontlie("/v1/teams", {"per_page": 1})
-        balldontlie_status = "connected"
-    except:
-        balldontlie_status = "error"
-    
+    # Refreshed by the background ping, so probes don't spend upstream requests
     return {
         "api": "healthy",
         "database": "connected",
-        "balldontlie_api": balldontlie_status,
+        "balldontlie_api": app.state.balldontlie_status,
         "tier": "GOAT",
         "timestamp": datetime.utcnow().isoformat()
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop + httptools ship with uvicorn[standard]
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=WEB_CONCURRENCY
+    )
@@ -3,10 +3,10 @@ Database Migration Script - Add GOAT Tier Tables
 Run this ONCE on existing deployments to add new tables without losing data
 """
 
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, inspect, text
 import os
 
-from database import Base, AdvancedStats, PlayerInjury, BettingOdds, SeasonAverages
+from database import Base, Game, GameStats, AdvancedStats, PlayerInjury, BettingOdds, SeasonAverages, SyncState
 
 def run_migration():
     """
@@ -36,7 +36,8 @@ def run_migration():
             poolclass=StaticPool
         )
     else:
-        engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+        # One-off script: a single connection is all we need
+        engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_size=1, max_overflow=0)
     
     # Check existing tables
     inspector = inspect(engine)
@@ -50,9 +51,38 @@ def run_migration():
         "advanced_stats": AdvancedStats,
         "player_injuries": PlayerInjury,
         "betting_odds": BettingOdds,
-        "season_averages": SeasonAverages
+        "season_averages": SeasonAverages,
+        "sync_state": SyncState
     }
     
+    # Indexes added (or made unique) on existing tables after their first deploy (create_all skips existing tables)
+    for table_class in (Game, GameStats):
+        table_name = table_class.__tablename__
+        if table_name not in existing_tables:
+            continue
+        existing_indexes = {index["name"]: index for index in inspector.get_indexes(table_name)}
+        for index in table_class.__table__.indexes:
+            current = existing_indexes.get(index.name)
+            if current is not None and bool(current["unique"]) == index.unique:
+                continue
+            try:
+                with engine.begin() as connection:
+                    if index.unique:
+                        # Keep the first copy of each duplicate so the unique index can be built
+                        columns = ", ".join(column.name for column in index.columns)
+                        removed = connection.execute(text(
+                            f"DELETE FROM {table_name} WHERE id NOT IN "
+                            f"(SELECT MIN(id) FROM {table_name} GROUP BY {columns})"
+                        )).rowcount
+                        if removed:
+                            print(f"🧹 Removed {removed} duplicate rows from {table_name}")
+                    if current is not None:
+                        index.drop(bind=connection)
+                    index.create(bind=connection)
+                print(f"🆕 Created index {index.name} on {table_name}")
+            except Exception as e:
+                print(f"⚠️  Could not create index {index.name}: {e}")
+    
     # Check which tables need to be created
     tables_to_create = []
     for table_name, table_class in new_tables.items():
@@ -66,8 +96,9 @@ def run_migration():
     
     print(f"\n🆕 Creating new tables: {', '.join(tables_to_create)}")
     
-    # Create only new tables (won't affect existing ones)
-    Base.metadata.create_all(bind=engine, checkfirst=True)
+    # Create only the missing tables; we already know they don't exist, so skip the per-table check
+    target_tables = [new_tables[name].__table__ for name in tables_to_create]
+    Base.metadata.create_all(bind=engine, tables=target_tables, checkfirst=False)
     
     print("\n✅ Migration completed successfully!")
     print("=" * 60)
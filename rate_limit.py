@@ -0,0 +1,64 @@
+"""
+Client-side rate limiting and retry backoff for BallDontLie calls
+GOAT tier allows 600 requests/minute
+"""
+
+import asyncio
+import random
+import time
+from typing import Mapping
+
+import httpx
+
+# Upstream statuses worth retrying after a short wait
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Connection flaps worth retrying (a PoolTimeout means we're saturated, so it isn't one)
+RETRYABLE_TRANSPORT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.ReadTimeout,
+    httpx.RemoteProtocolError,
+)
+
+# Longest Retry-After we're willing to sit out before trying again
+MAX_RETRY_AFTER = 10.0
+
+
+class TokenBucket:
+    """Async token bucket: refills `rate` tokens per second, holds at most `capacity`"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available, then take it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, initial: float = 0.2, maximum: float = 2.0) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (1-based)"""
+    return random.uniform(0, min(maximum, initial * 2 ** (attempt - 1)))
+
+
+def retry_delay(headers: Mapping[str, str], attempt: int) -> float:
+    """Wait before retrying: the upstream Retry-After (in seconds) when given, else backoff"""
+    retry_after = headers.get("retry-after", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER)
+    return backoff_delay(attempt)
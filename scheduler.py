@@ -1,28 +1,39 @@
 """
 Scheduler for automated daily data synchronization
 Runs at 6 AM daily (after NBA games finish)
+
+Started inside the API process by main.py's lifespan (SCHEDULER_ENABLED),
+or standalone with `python scheduler.py` as a separate worker.
 """
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 import asyncio
-from sync_service import run_daily_sync
+from sync_service import run_daily_sync, start_log_listener
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def start_scheduler():
-    """Start the scheduler for daily sync"""
+def start_scheduler(rate_limiter=None):
+    """
+    Start the scheduler for daily sync
+    Pass the API's TokenBucket when running in-process so the sync shares its request budget
+    """
     scheduler = AsyncIOScheduler()
     
-    # Schedule daily sync at 6 AM UTC (adjust timezone as needed)
+    # Schedule daily sync at 6 AM UTC (adjust timezone as needed).
+    # Jitter spreads replicas over 5 minutes; a run missed by up to an hour
+    # (e.g. during a redeploy) still fires once, and runs never overlap.
     scheduler.add_job(
         run_daily_sync,
-        trigger=CronTrigger(hour=6, minute=0),
+        trigger=CronTrigger(hour=6, minute=0, jitter=300),
         id='daily_nba_sync',
         name='Daily NBA Data Sync',
-        replace_existing=True
+        misfire_grace_time=3600,
+        coalesce=True,
+        max_instances=1,
+        replace_existing=True,
+        kwargs={"rate_limiter": rate_limiter}
     )
     
     logger.info("📅 Scheduler started - daily sync at 6:00 AM UTC")
@@ -30,11 +41,18 @@ def start_scheduler():
     
     return scheduler
 
-if __name__ == "__main__":
+async def main():
+    """Run the scheduler until the process is stopped"""
     scheduler = start_scheduler()
-    
-    # Keep the script running
     try:
-        asyncio.get_event_loop().run_forever()
+        await asyncio.Event().wait()
+    finally:
+        scheduler.shutdown(wait=False)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    start_log_listener()
+    try:
+        asyncio.run(main())
     except (KeyboardInterrupt, SystemExit):
         logger.info("Scheduler stopped")
@@ -6,173 +6,375 @@ Includes: Advanced stats, injuries, betting odds, active players
 
 import httpx
 import asyncio
+import atexit
+import logging
+import queue
+import sys
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import os
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
-from database import Player, Team, Game, GameStats, AdvancedStats, PlayerInjury, BettingOdds, SyncLog
-from db_session import get_db_context
+from database import Player, Team, Game, GameStats, AdvancedStats, PlayerInjury, BettingOdds, SyncLog, SyncState
+from db_session import engine, get_db_context, bulk_upsert, bulk_insert
+from rate_limit import TokenBucket, backoff_delay, retry_delay, RETRYABLE_STATUS_CODES, RETRYABLE_TRANSPORT_ERRORS
 
 BALLDONTLIE_API_KEY = os.getenv("BALLDONTLIE_API_KEY")
 BALLDONTLIE_BASE_URL = "https://api.balldontlie.io/v1"
 
+# Rows per executemany INSERT for player game stats
+STATS_BATCH_SIZE = 10_000
+
+# Box score counting stats (default 0) and shooting percentages (nullable) copied straight from the API
+STAT_COUNT_COLUMNS = (
+    "fgm", "fga", "fg3m", "fg3a", "ftm", "fta", "oreb", "dreb", "reb",
+    "ast", "stl", "blk", "turnover", "pf", "pts"
+)
+STAT_PCT_COLUMNS = ("fg_pct", "fg3_pct", "ft_pct")
+
+# Days of stats paged concurrently, and the request budget shared by every sync call
+# (used when the sync isn't handed the API's own bucket)
+SYNC_CONCURRENCY = 5
+SYNC_REQUESTS_PER_SECOND = float(os.getenv("SYNC_REQUESTS_PER_SECOND", 5))
+
+# Tries per API call before a 429/5xx or connection error is raised
+SYNC_ATTEMPTS = 5
+
+# Fetched days allowed to wait for the database writer
+SYNC_QUEUE_SIZE = 20
+
+# PostgreSQL advisory lock key held while a daily sync runs (any process, any replica)
+DAILY_SYNC_LOCK_KEY = 20240601
+
+logger = logging.getLogger(__name__)
+_log_listener: Optional[QueueListener] = None
+
+
+def start_log_listener():
+    """
+    Hand sync log records to a background thread so stdout writes never block the event loop
+    Called by the entry points (API lifespan, scheduler, scripts); safe to call more than once
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    _log_listener = QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def date_chunks(start_date: date, end_date: date, days: int = 7):
+    """Split an inclusive date range into consecutive (chunk_start, chunk_end) windows"""
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=days - 1), end_date)
+        yield chunk_start, chunk_end
+        chunk_start = chunk_end + timedelta(days=1)
+
 
 class DataSyncService:
     """Service for syncing NBA data from Balldontlie API to database - GOAT Edition"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, rate_limiter: Optional[TokenBucket] = None):
         self.api_key = api_key or BALLDONTLIE_API_KEY
         self.headers = {"Authorization": self.api_key}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+        self._rate_limiter = rate_limiter or TokenBucket(SYNC_REQUESTS_PER_SECOND, SYNC_CONCURRENCY)
+        self._write_lock = asyncio.Lock()
     
-    async def fetch_api(self, endpoint: str, params: Dict = None) -> Dict:
-        """Fetch data from Balldontlie API"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{BALLDONTLIE_BASE_URL}/{endpoint}",
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive HTTP/2 client, created on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=BALLDONTLIE_BASE_URL,
                 headers=self.headers,
-                params=params or {}
+                timeout=30.0,
+                http2=True,
+                limits=httpx.Limits(max_connections=40, max_keepalive_connections=20)
             )
-            response.raise_for_status()
-            return response.json()
+        return self._client
     
-    async def sync_teams(self, db: Session) -> int:
-        """Sync all NBA teams using cursor pagination"""
-        print("🏀 Syncing teams...")
-        
-        all_teams = []
-        cursor = None
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def _run_db(self, work, *args):
+        """
+        Run blocking session work in a thread, one call at a time
+        If the caller is cancelled, wait for the thread before letting it tear the session down
+        """
+        async with self._write_lock:
+            future = asyncio.ensure_future(asyncio.to_thread(work, *args))
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                await asyncio.gather(future, return_exceptions=True)
+                raise
+    
+    async def _get(self, endpoint: str, params: Dict = None, headers: Dict = None) -> httpx.Response:
+        """GET from Balldontlie API, retrying rate limits and upstream hiccups with backoff"""
+        for attempt in range(1, SYNC_ATTEMPTS + 1):
+            await self._rate_limiter.acquire()
+            try:
+                response = await self.client.get(endpoint, params=params or {}, headers=headers)
+            except RETRYABLE_TRANSPORT_ERRORS as e:
+                if attempt == SYNC_ATTEMPTS:
+                    raise
+                logger.warning("⚠️  %s failed (%s), retrying (attempt %s/%s)", endpoint, type(e).__name__, attempt, SYNC_ATTEMPTS)
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < SYNC_ATTEMPTS:
+                logger.warning("⚠️  %s returned %s, retrying (attempt %s/%s)", endpoint, response.status_code, attempt, SYNC_ATTEMPTS)
+                await asyncio.sleep(retry_delay(response.headers, attempt))
+                continue
+            
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+    
+    async def fetch_api(self, endpoint: str, params: Dict = None) -> Dict:
+        """Fetch data from Balldontlie API"""
+        response = await self._get(endpoint, params)
+        return response.json()
+    
+    async def _paginate(self, endpoint: str, params: Dict = None):
+        """Yield records one page at a time, following next_cursor until the last page"""
+        params = dict(params or {})
         
         while True:
-            params = {"per_page": 100}
-            if cursor:
-                params["cursor"] = cursor
-            
-            data = await self.fetch_api("teams", params)
-            teams_data = data.get("data", [])
-            
-            if not teams_data:
-                break
+            data = await self.fetch_api(endpoint, params)
+            records = data.get("data", [])
             
-            all_teams.extend(teams_data)
+            if not records:
+                return
             
-            # Get next cursor
-            meta = data.get("meta", {})
-            cursor = meta.get("next_cursor")
+            for record in records:
+                yield record
             
+            # Get next cursor from meta
+            cursor = data.get("meta", {}).get("next_cursor")
             if not cursor:
-                break
+                return
             
-            await asyncio.sleep(0.1)
+            params["cursor"] = cursor
+    
+    def _load_etag(self, db: Session, endpoint: str) -> Optional[str]:
+        """ETag stored by the last sync of an endpoint, if any"""
+        return db.execute(select(SyncState.etag).where(SyncState.endpoint == endpoint)).scalar()
+    
+    def _save_sync_state(self, db: Session, endpoint: str, etag: Optional[str]):
+        """Record an endpoint's ETag and sync time, committing along with anything else pending"""
+        bulk_upsert(db, SyncState.__table__, [{
+            "endpoint": endpoint,
+            "etag": etag,
+            "last_synced": datetime.utcnow()
+        }], index_elements=["endpoint"])
+        db.commit()
+    
+    def _store_teams(self, db: Session, all_teams: List[Dict], etag: Optional[str]) -> Tuple[int, int, int]:
+        """Upsert the fetched teams and their ETag in one commit; returns (new, updated, skipped)"""
+        # One lookup for every stored team instead of a SELECT per row
+        existing = dict(db.query(Team.id, Team.abbreviation).all())
+        id_by_abbreviation = {abbr: team_id for team_id, abbr in existing.items()}
         
+        rows = {}
         synced = 0
         updated = 0
         skipped = 0
         
         for team_data in all_teams:
-            # Find by ID (not abbreviation to avoid conflicts)
-            team = db.query(Team).filter(Team.id == team_data["id"]).first()
-            
-            if not team:
+            if team_data["id"] not in existing:
                 # Check if abbreviation exists with different ID
-                existing_abbr = db.query(Team).filter(
-                    Team.abbreviation == team_data["abbreviation"],
-                    Team.id != team_data["id"]
-                ).first()
+                existing_id = id_by_abbreviation.get(team_data["abbreviation"])
                 
-                if existing_abbr:
-                    print(f"⚠️ Skipping team {team_data['abbreviation']} (ID {team_data['id']}) - abbreviation already exists for ID {existing_abbr.id}")
+                if existing_id is not None and existing_id != team_data["id"]:
+                    logger.warning(
+                        "⚠️ Skipping team %s (ID %s) - abbreviation already exists for ID %s",
+                        team_data["abbreviation"], team_data["id"], existing_id
+                    )
                     skipped += 1
                     continue
                 
-                team = Team(
-                    id=team_data["id"],
-                    abbreviation=team_data["abbreviation"],
-                    city=team_data.get("city"),
-                    conference=team_data.get("conference"),
-                    division=team_data.get("division"),
-                    full_name=team_data.get("full_name"),
-                    name=team_data.get("name")
-                )
-                db.add(team)
                 synced += 1
             else:
-                # Update existing team
-                team.abbreviation = team_data["abbreviation"]
-                team.city = team_data.get("city")
-                team.conference = team_data.get("conference")
-                team.division = team_data.get("division")
-                team.full_name = team_data.get("full_name")
-                team.name = team_data.get("name")
                 updated += 1
+            
+            rows[team_data["id"]] = {
+                "id": team_data["id"],
+                "abbreviation": team_data["abbreviation"],
+                "city": team_data.get("city"),
+                "conference": team_data.get("conference"),
+                "division": team_data.get("division"),
+                "full_name": team_data.get("full_name"),
+                "name": team_data.get("name")
+            }
         
-        db.commit()
-        print(f"✅ Teams synced: {synced} new, {updated} updated, {skipped} skipped")
+        bulk_upsert(db, Team.__table__, list(rows.values()), index_elements=["id"])
+        self._save_sync_state(db, "teams", etag)
+        return synced, updated, skipped
+    
+    async def sync_teams(self, db: Session) -> int:
+        """Sync all NBA teams using cursor pagination"""
+        logger.info("🏀 Syncing teams...")
+        
+        # Teams rarely change: revalidate against the ETag stored by the last teams sync (any process)
+        etag = await self._run_db(self._load_etag, db, "teams")
+        response = await self._get("teams", {"per_page": 100}, {"If-None-Match": etag} if etag else None)
+        if response.status_code == 304:
+            await self._run_db(self._save_sync_state, db, "teams", etag)
+            logger.info("✅ Teams unchanged since last sync, skipping")
+            return 0
+        
+        data = response.json()
+        all_teams = data.get("data", [])
+        cursor = data.get("meta", {}).get("next_cursor")
+        if cursor:
+            all_teams += [
+                team_data async for team_data in
+                self._paginate("teams", {"per_page": 100, "cursor": cursor})
+            ]
+        
+        # The ETag is stored in the same commit as the teams
+        synced, updated, skipped = await self._run_db(
+            self._store_teams, db, all_teams, response.headers.get("etag")
+        )
+        
+        logger.info("✅ Teams synced: %s new, %s updated, %s skipped", synced, updated, skipped)
         return len(all_teams)
     
+    def _store_players(self, db: Session, rows: Dict) -> int:
+        """Upsert player rows keyed by id; returns how many were new"""
+        existing_ids = {
+            player_id for (player_id,) in
+            db.query(Player.id).filter(Player.id.in_(list(rows))).all()
+        } if rows else set()
+        
+        bulk_upsert(db, Player.__table__, list(rows.values()), index_elements=["id"])
+        db.commit()
+        return len(rows) - len(existing_ids)
+    
     async def sync_players(self, db: Session) -> int:
         """Sync all ACTIVE NBA players using cursor pagination (GOAT tier feature)"""
-        print("👥 Syncing players...")
-        
-        all_players = []
-        cursor = None
-        
-        while True:
-            params = {"per_page": 100}
-            if cursor:
-                params["cursor"] = cursor
-            
-            print(f"   Fetching players (cursor: {cursor or 'initial'})...")
-            
-            # GOAT tier: Use /players/active endpoint for current rosters only
-            data = await self.fetch_api("players/active", params)
-            players_data = data.get("data", [])
-            
-            if not players_data:
-                break
-            
-            all_players.extend(players_data)
-            print(f"   ✓ Got {len(players_data)} players (total: {len(all_players)})")
-            
-            # Get next cursor from meta
-            meta = data.get("meta", {})
-            cursor = meta.get("next_cursor")
-            
-            if not cursor:
-                break
-            
-            await asyncio.sleep(0.1)  # Rate limiting
+        logger.info("👥 Syncing players...")
         
-        synced = 0
-        for player_data in all_players:
-            player = db.query(Player).filter(Player.id == player_data["id"]).first()
-            
+        # GOAT tier: Use /players/active endpoint for current rosters only.
+        # Rows are built as each page arrives, so raw pages are never held for the whole roster
+        rows = {}
+        async for player_data in self._paginate("players/active", {"per_page": 100}):
             team_data = player_data.get("team", {})
             
-            if not player:
-                player = Player(
-                    id=player_data["id"],
-                    first_name=player_data["first_name"],
-                    last_name=player_data["last_name"],
-                    position=player_data.get("position"),
-                    team_id=team_data.get("id") if team_data else None,
-                    team_name=team_data.get("full_name") if team_data else None,
-                    team_abbreviation=team_data.get("abbreviation") if team_data else None
-                )
-                db.add(player)
-                synced += 1
-            else:
-                # Update existing player
-                player.first_name = player_data["first_name"]
-                player.last_name = player_data["last_name"]
-                player.position = player_data.get("position")
-                player.team_id = team_data.get("id") if team_data else None
-                player.team_name = team_data.get("full_name") if team_data else None
-                player.team_abbreviation = team_data.get("abbreviation") if team_data else None
+            rows[player_data["id"]] = {
+                "id": player_data["id"],
+                "first_name": player_data["first_name"],
+                "last_name": player_data["last_name"],
+                "position": player_data.get("position"),
+                "team_id": team_data.get("id") if team_data else None,
+                "team_name": team_data.get("full_name") if team_data else None,
+                "team_abbreviation": team_data.get("abbreviation") if team_data else None
+            }
+        logger.info("   ✓ Got %s players", len(rows))
+        
+        synced = await self._run_db(self._store_players, db, rows)
+        logger.info("✅ Players synced: %s new, %s updated", synced, len(rows) - synced)
+        return len(rows)
+    
+    async def _collect_stats_for_date(self, day: date, season: int) -> Tuple[Dict, Dict]:
+        """Page through one day's stats, turning each record into game/stat rows as it arrives"""
+        game_rows = {}
+        stat_rows = {}
+        
+        async with self._semaphore:
+            async for stat in self._paginate("stats", {"dates[]": day.isoformat(), "per_page": 100}):
+                game_data = stat.get("game", {})
+                player_data = stat.get("player", {})
+                team_data = stat.get("team", {})
+                
+                if game_data["id"] not in game_rows:
+                    game_rows[game_data["id"]] = {
+                        "id": game_data["id"],
+                        "date": date.fromisoformat(game_data["date"][:10]),
+                        "season": game_data.get("season", season),
+                        "status": game_data.get("status"),
+                        "home_team_id": game_data.get("home_team_id"),
+                        "visitor_team_id": game_data.get("visitor_team_id"),
+                        "home_team_score": game_data.get("home_team_score"),
+                        "visitor_team_score": game_data.get("visitor_team_score")
+                    }
+                
+                stat_key = (player_data["id"], game_data["id"])
+                if stat_key in stat_rows:
+                    continue
+                
+                # Bind the lookups once; this runs for every stat of the range.
+                # Stat records always carry their team and the game's home team, so compare directly
+                get = stat.get
+                team_id = team_data["id"]
+                stat_rows[stat_key] = {
+                    "player_id": stat_key[0],
+                    "game_id": stat_key[1],
+                    "team_id": team_id,
+                    "is_home": team_id == game_data["home_team_id"],
+                    "minutes": get("min"),
+                    **{column: get(column, 0) for column in STAT_COUNT_COLUMNS},
+                    **{column: get(column) for column in STAT_PCT_COLUMNS}
+                }
+        
+        return game_rows, stat_rows
+    
+    async def _produce_stats_for_date(self, day: date, season: int, queue: asyncio.Queue):
+        """Fetch one day's rows and hand them (or the error that stopped the day) to the writer"""
+        try:
+            day_rows = await self._collect_stats_for_date(day, season)
+        except Exception as e:
+            day_rows = e
+        await queue.put(day_rows)
+    
+    def _store_games_and_stats(self, db: Session, game_rows: Dict, stat_rows: Dict) -> Tuple[int, int]:
+        """Upsert a batch of games and insert their new stats; returns (new games, new stats)"""
+        # Look up what's stored by the incoming game ids (not by date, which may have been stored differently)
+        game_ids = list(game_rows)
+        existing_game_ids = set(db.execute(select(Game.id).where(Game.id.in_(game_ids))).scalars())
+        existing_stats = set(db.execute(
+            select(GameStats.player_id, GameStats.game_id).where(GameStats.game_id.in_(game_ids))
+        ).tuples())
+        
+        # Upsert every game referenced by the stats in batches
+        # (refreshes status/scores of games stored before they finished)
+        new_games = len(game_rows.keys() - existing_game_ids)
+        bulk_upsert(db, Game.__table__, list(game_rows.values()), index_elements=["id"])
+        
+        # Insert (COPY on PostgreSQL) in fixed-size batches, committing each so memory and transactions stay bounded.
+        # Rows are already filtered against what's stored, so no conflict handling is needed
+        new_stats = [row for stat_key, row in stat_rows.items() if stat_key not in existing_stats]
+        for i in range(0, len(new_stats), STATS_BATCH_SIZE):
+            bulk_insert(db, GameStats.__table__, new_stats[i:i + STATS_BATCH_SIZE])
+            db.commit()
         
         db.commit()
-        print(f"✅ Players synced: {synced} new, {len(all_players) - synced} updated")
-        return len(all_players)
+        return new_games, len(new_stats)
     
     async def sync_games_for_date_range(
         self, 
@@ -182,113 +384,98 @@ class DataSyncService:
         season: int
     ) -> int:
         """Sync games and basic stats for a date range using cursor pagination"""
-        print(f"📅 Syncing games from {start_date} to {end_date}...")
+        logger.info("📅 Syncing games from %s to %s...", start_date, end_date)
         
-        all_stats = []
-        cursor = None
-        page_count = 0
+        # Days are fetched concurrently (bounded by the semaphore and the rate limiter) and
+        # queued for this single writer, which runs DB work in a thread so downloads continue
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        queue = asyncio.Queue(maxsize=SYNC_QUEUE_SIZE)
+        producers = asyncio.gather(*(self._produce_stats_for_date(day, season, queue) for day in days))
         
-        # Use cursor-based pagination with date range
-        params = {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "per_page": 100
-        }
+        game_rows = {}
+        stat_rows = {}
+        games_synced = 0
+        stats_synced = 0
+        stats_fetched = 0
         
-        while True:
-            page_count += 1
-            
-            if cursor:
-                params["cursor"] = cursor
-            
-            print(f"   Fetching stats page {page_count} (cursor: {cursor or 'initial'})...")
-            
-            try:
-                data = await self.fetch_api("stats", params)
-                stats_data = data.get("data", [])
+        try:
+            for i in range(len(days)):
+                day_rows = await queue.get()
+                if isinstance(day_rows, Exception):
+                    raise day_rows
                 
-                if not stats_data:
-                    break
+                day_games, day_stats = day_rows
+                game_rows.update(day_games)
+                stat_rows.update(day_stats)
+                stats_fetched += len(day_stats)
                 
-                all_stats.extend(stats_data)
-                print(f"   ✓ Got {len(stats_data)} stats (total: {len(all_stats)})")
-                
-                # Get next cursor from meta
-                meta = data.get("meta", {})
-                cursor = meta.get("next_cursor")
-                
-                if not cursor:
-                    break
-                
-                await asyncio.sleep(0.1)
-            
-            except Exception as e:
-                print(f"⚠️  Error fetching stats: {e}")
-                break
+                # Write once a full batch has built up (and whatever is left at the end)
+                if len(stat_rows) >= STATS_BATCH_SIZE or i == len(days) - 1:
+                    # Callers may run several ranges at once; write one batch at a time
+                    new_games, new_stats = await self._run_db(self._store_games_and_stats, db, game_rows, stat_rows)
+                    games_synced += new_games
+                    stats_synced += new_stats
+                    game_rows = {}
+                    stat_rows = {}
+            
+            await producers
+        finally:
+            # Stop the remaining days if the writer (or a day) failed
+            if not producers.done():
+                producers.cancel()
+                await asyncio.gather(producers, return_exceptions=True)
         
-        # Process and store stats
-        games_synced = 0
-        stats_synced = 0
+        logger.info("   ✓ Got %s stats across %s days", stats_fetched, len(days))
+        logger.info("✅ Synced %s games, %s player stats", games_synced, stats_synced)
+        return games_synced
+    
+    def _store_advanced_stats(self, db: Session, all_stats: List[Dict]) -> int:
+        """Insert the advanced stats we don't have yet; returns how many were new"""
+        # Load the (player, game) pairs we already have for these games in one query
+        game_ids = {stat["game"]["id"] for stat in all_stats}
+        existing_stats = {
+            (player_id, game_id) for player_id, game_id in
+            db.query(AdvancedStats.player_id, AdvancedStats.game_id).filter(AdvancedStats.game_id.in_(list(game_ids))).all()
+        } if game_ids else set()
         
+        # Build plain rows for new stats only and insert them with one executemany
+        stat_rows = {}
         for stat in all_stats:
-            game_data = stat.get("game", {})
             player_data = stat.get("player", {})
+            game_data = stat.get("game", {})
             team_data = stat.get("team", {})
             
-            # Ensure game exists
-            game = db.query(Game).filter(Game.id == game_data["id"]).first()
-            if not game:
-                game = Game(
-                    id=game_data["id"],
-                    date=datetime.fromisoformat(game_data["date"].replace('Z', '+00:00')).date(),
-                    season=game_data.get("season", season),
-                    status=game_data.get("status"),
-                    home_team_id=game_data.get("home_team_id"),
-                    visitor_team_id=game_data.get("visitor_team_id"),
-                    home_team_score=game_data.get("home_team_score"),
-                    visitor_team_score=game_data.get("visitor_team_score")
-                )
-                db.add(game)
-                games_synced += 1
-            
-            # Check if stat already exists
-            existing_stat = db.query(GameStats).filter(
-                GameStats.player_id == player_data["id"],
-                GameStats.game_id == game_data["id"]
-            ).first()
-            
-            if not existing_stat:
-                game_stat = GameStats(
-                    player_id=player_data["id"],
-                    game_id=game_data["id"],
-                    team_id=team_data.get("id"),
-                    is_home=game_data.get("home_team_id") == team_data.get("id"),
-                    minutes=stat.get("min"),
-                    fgm=stat.get("fgm", 0),
-                    fga=stat.get("fga", 0),
-                    fg_pct=stat.get("fg_pct"),
-                    fg3m=stat.get("fg3m", 0),
-                    fg3a=stat.get("fg3a", 0),
-                    fg3_pct=stat.get("fg3_pct"),
-                    ftm=stat.get("ftm", 0),
-                    fta=stat.get("fta", 0),
-                    ft_pct=stat.get("ft_pct"),
-                    oreb=stat.get("oreb", 0),
-                    dreb=stat.get("dreb", 0),
-                    reb=stat.get("reb", 0),
-                    ast=stat.get("ast", 0),
-                    stl=stat.get("stl", 0),
-                    blk=stat.get("blk", 0),
-                    turnover=stat.get("turnover", 0),
-                    pf=stat.get("pf", 0),
-                    pts=stat.get("pts", 0)
-                )
-                db.add(game_stat)
-                stats_synced += 1
+            stat_key = (player_data["id"], game_data["id"])
+            if stat_key in existing_stats or stat_key in stat_rows:
+                continue
+            
+            stat_rows[stat_key] = {
+                "id": stat.get("id"),
+                "player_id": player_data["id"],
+                "game_id": game_data["id"],
+                "team_id": team_data.get("id"),
+                "pie": stat.get("pie"),
+                "pace": stat.get("pace"),
+                "assist_percentage": stat.get("assist_percentage"),
+                "assist_ratio": stat.get("assist_ratio"),
+                "assist_to_turnover": stat.get("assist_to_turnover"),
+                "defensive_rating": stat.get("defensive_rating"),
+                "defensive_rebound_percentage": stat.get("defensive_rebound_percentage"),
+                "effective_field_goal_percentage": stat.get("effective_field_goal_percentage"),
+                "net_rating": stat.get("net_rating"),
+                "offensive_rating": stat.get("offensive_rating"),
+                "offensive_rebound_percentage": stat.get("offensive_rebound_percentage"),
+                "rebound_percentage": stat.get("rebound_percentage"),
+                "true_shooting_percentage": stat.get("true_shooting_percentage"),
+                "turnover_ratio": stat.get("turnover_ratio"),
+                "usage_percentage": stat.get("usage_percentage")
+            }
         
+        new_stats = list(stat_rows.values())
+        for i in range(0, len(new_stats), STATS_BATCH_SIZE):
+            db.execute(AdvancedStats.__table__.insert(), new_stats[i:i + STATS_BATCH_SIZE])
         db.commit()
-        print(f"✅ Synced {games_synced} games, {stats_synced} player stats")
-        return games_synced
+        return len(new_stats)
     
     async def sync_advanced_stats_for_date_range(
         self, 
@@ -298,10 +485,7 @@ class DataSyncService:
         season: int
     ) -> int:
         """Sync advanced stats (GOAT tier feature)"""
-        print(f"📊 Syncing advanced stats from {start_date} to {end_date}...")
-        
-        all_stats = []
-        cursor = None
+        logger.info("📊 Syncing advanced stats from %s to %s...", start_date, end_date)
         
         params = {
             "start_date": start_date.isoformat(),
@@ -310,276 +494,240 @@ class DataSyncService:
             "seasons[]": season
         }
         
-        while True:
-            if cursor:
-                params["cursor"] = cursor
-            
-            try:
-                # GOAT tier endpoint
-                data = await self.fetch_api("stats/advanced", params)
-                stats_data = data.get("data", [])
-                
-                if not stats_data:
-                    break
-                
-                all_stats.extend(stats_data)
-                print(f"   ✓ Got {len(stats_data)} advanced stats (total: {len(all_stats)})")
-                
-                meta = data.get("meta", {})
-                cursor = meta.get("next_cursor")
-                
-                if not cursor:
-                    break
-                
-                await asyncio.sleep(0.1)
-            
-            except Exception as e:
-                print(f"⚠️  Error fetching advanced stats: {e}")
-                break
+        all_stats = []
+        try:
+            # GOAT tier endpoint
+            async for stat in self._paginate("stats/advanced", params):
+                all_stats.append(stat)
+        except httpx.HTTPError as e:
+            # Retries are exhausted; keep what was fetched and store it
+            logger.warning("⚠️  Error fetching advanced stats: %s", e)
+        logger.info("   ✓ Got %s advanced stats", len(all_stats))
         
-        # Store in database
-        stats_synced = 0
-        for stat in all_stats:
-            player_data = stat.get("player", {})
-            game_data = stat.get("game", {})
-            team_data = stat.get("team", {})
-            
-            # Check if exists
-            existing = db.query(AdvancedStats).filter(
-                AdvancedStats.player_id == player_data["id"],
-                AdvancedStats.game_id == game_data["id"]
-            ).first()
-            
-            if not existing:
-                adv_stat = AdvancedStats(
-                    id=stat.get("id"),
-                    player_id=player_data["id"],
-                    game_id=game_data["id"],
-                    team_id=team_data.get("id"),
-                    pie=stat.get("pie"),
-                    pace=stat.get("pace"),
-                    assist_percentage=stat.get("assist_percentage"),
-                    assist_ratio=stat.get("assist_ratio"),
-                    assist_to_turnover=stat.get("assist_to_turnover"),
-                    defensive_rating=stat.get("defensive_rating"),
-                    defensive_rebound_percentage=stat.get("defensive_rebound_percentage"),
-                    effective_field_goal_percentage=stat.get("effective_field_goal_percentage"),
-                    net_rating=stat.get("net_rating"),
-                    offensive_rating=stat.get("offensive_rating"),
-                    offensive_rebound_percentage=stat.get("offensive_rebound_percentage"),
-                    rebound_percentage=stat.get("rebound_percentage"),
-                    true_shooting_percentage=stat.get("true_shooting_percentage"),
-                    turnover_ratio=stat.get("turnover_ratio"),
-                    usage_percentage=stat.get("usage_percentage")
-                )
-                db.add(adv_stat)
-                stats_synced += 1
+        stats_synced = await self._run_db(self._store_advanced_stats, db, all_stats)
+        logger.info("✅ Synced %s advanced stats", stats_synced)
+        return stats_synced
+    
+    def _store_injuries(self, db: Session, all_injuries: List[Dict]):
+        """Replace the stored injury reports with the fetched ones"""
+        # Clear old injuries (they change daily)
+        db.query(PlayerInjury).delete(synchronize_session=False)
+        
+        # Add new ones in a single executemany
+        injury_rows = [
+            {
+                "player_id": injury_data.get("player", {})["id"],
+                "return_date": injury_data.get("return_date"),
+                "description": injury_data.get("description"),
+                "status": injury_data.get("status")
+            }
+            for injury_data in all_injuries
+        ]
+        if injury_rows:
+            db.execute(PlayerInjury.__table__.insert(), injury_rows)
         
         db.commit()
-        print(f"✅ Synced {stats_synced} advanced stats")
-        return stats_synced
     
     async def sync_player_injuries(self, db: Session) -> int:
         """Sync current player injuries (ALL-STAR+ tier)"""
-        print("🏥 Syncing player injuries...")
+        logger.info("🏥 Syncing player injuries...")
         
-        cursor = None
         all_injuries = []
+        try:
+            async for injury_data in self._paginate("player_injuries", {"per_page": 100}):
+                all_injuries.append(injury_data)
+        except httpx.HTTPError as e:
+            # Retries are exhausted. Storing replaces the whole table, so a partial list
+            # would wipe current injuries: keep yesterday's reports instead
+            logger.warning("⚠️  Error fetching injuries, keeping the stored reports: %s", e)
+            return 0
+        logger.info("   ✓ Got %s injuries", len(all_injuries))
         
-        while True:
-            params = {"per_page": 100}
-            if cursor:
-                params["cursor"] = cursor
-            
-            try:
-                data = await self.fetch_api("player_injuries", params)
-                injuries_data = data.get("data", [])
-                
-                if not injuries_data:
-                    break
-                
-                all_injuries.extend(injuries_data)
-                print(f"   ✓ Got {len(injuries_data)} injuries (total: {len(all_injuries)})")
-                
-                meta = data.get("meta", {})
-                cursor = meta.get("next_cursor")
-                
-                if not cursor:
-                    break
-                
-                await asyncio.sleep(0.1)
-            
-            except Exception as e:
-                print(f"⚠️  Error fetching injuries: {e}")
-                break
-        
-        # Clear old injuries (they change daily)
-        db.query(PlayerInjury).delete()
+        await self._run_db(self._store_injuries, db, all_injuries)
+        logger.info("✅ Synced %s injuries", len(all_injuries))
+        return len(all_injuries)
+    
+    def _store_betting_odds(self, db: Session, all_odds: List[Dict]) -> Tuple[int, int]:
+        """Insert new odds lines and refresh stored ones; returns (new, updated)"""
+        # Load the ids of every stored line for these odds in one query
+        odds_ids = [odds["id"] for odds in all_odds]
+        existing_ids = {
+            odds_id for (odds_id,) in
+            db.query(BettingOdds.id).filter(BettingOdds.id.in_(odds_ids)).all()
+        } if odds_ids else set()
         
-        # Add new ones
-        for injury_data in all_injuries:
-            player_data = injury_data.get("player", {})
-            
-            injury = PlayerInjury(
-                player_id=player_data["id"],
-                return_date=injury_data.get("return_date"),
-                description=injury_data.get("description"),
-                status=injury_data.get("status")
-            )
-            db.add(injury)
+        # Split into new and existing lines (existing ones change frequently)
+        to_insert = {}
+        to_update = {}
+        for odds in all_odds:
+            row = {
+                "id": odds["id"],
+                "game_id": odds["game_id"],
+                "vendor": odds["vendor"],
+                "spread_home_value": odds.get("spread_home_value"),
+                "spread_home_odds": odds.get("spread_home_odds"),
+                "spread_away_value": odds.get("spread_away_value"),
+                "spread_away_odds": odds.get("spread_away_odds"),
+                "moneyline_home_odds": odds.get("moneyline_home_odds"),
+                "moneyline_away_odds": odds.get("moneyline_away_odds"),
+                "total_value": odds.get("total_value"),
+                "total_over_odds": odds.get("total_over_odds"),
+                "total_under_odds": odds.get("total_under_odds"),
+                "updated_at": datetime.fromisoformat(odds["updated_at"].replace('Z', '+00:00'))
+            }
+            if odds["id"] in existing_ids:
+                to_update[odds["id"]] = row
+            else:
+                to_insert[odds["id"]] = row
         
+        db.bulk_insert_mappings(BettingOdds, list(to_insert.values()))
+        db.bulk_update_mappings(BettingOdds, list(to_update.values()))
         db.commit()
-        print(f"✅ Synced {len(all_injuries)} injuries")
-        return len(all_injuries)
+        return len(to_insert), len(to_update)
     
     async def sync_betting_odds_for_date(self, db: Session, target_date: date) -> int:
         """Sync betting odds for a specific date (GOAT tier)"""
-        print(f"💰 Syncing betting odds for {target_date}...")
+        logger.info("💰 Syncing betting odds for %s...", target_date)
         
-        cursor = None
-        all_odds = []
-        
-        while True:
-            params = {
-                "dates[]": target_date.isoformat(),
-                "per_page": 100
-            }
-            if cursor:
-                params["cursor"] = cursor
-            
-            try:
-                # Note: v2 endpoint for odds!
-                url = f"{BALLDONTLIE_BASE_URL.replace('/v1', '/v2')}/odds"
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.get(url, headers=self.headers, params=params)
-                    response.raise_for_status()
-                    data = response.json()
-                
-                odds_data = data.get("data", [])
-                
-                if not odds_data:
-                    break
-                
-                all_odds.extend(odds_data)
-                print(f"   ✓ Got {len(odds_data)} odds lines (total: {len(all_odds)})")
-                
-                meta = data.get("meta", {})
-                cursor = meta.get("next_cursor")
-                
-                if not cursor:
-                    break
-                
-                await asyncio.sleep(0.1)
-            
-            except Exception as e:
-                print(f"⚠️  Error fetching odds: {e}")
-                break
+        params = {
+            "dates[]": target_date.isoformat(),
+            "per_page": 100
+        }
         
-        # Store odds
-        synced = 0
-        for odds in all_odds:
-            existing = db.query(BettingOdds).filter(
-                BettingOdds.id == odds["id"]
-            ).first()
-            
-            if not existing:
-                betting_odds = BettingOdds(
-                    id=odds["id"],
-                    game_id=odds["game_id"],
-                    vendor=odds["vendor"],
-                    spread_home_value=odds.get("spread_home_value"),
-                    spread_home_odds=odds.get("spread_home_odds"),
-                    spread_away_value=odds.get("spread_away_value"),
-                    spread_away_odds=odds.get("spread_away_odds"),
-                    moneyline_home_odds=odds.get("moneyline_home_odds"),
-                    moneyline_away_odds=odds.get("moneyline_away_odds"),
-                    total_value=odds.get("total_value"),
-                    total_over_odds=odds.get("total_over_odds"),
-                    total_under_odds=odds.get("total_under_odds"),
-                    updated_at=datetime.fromisoformat(odds["updated_at"].replace('Z', '+00:00'))
-                )
-                db.add(betting_odds)
-                synced += 1
-            else:
-                # Update existing odds (they change frequently)
-                existing.spread_home_value = odds.get("spread_home_value")
-                existing.spread_home_odds = odds.get("spread_home_odds")
-                existing.spread_away_value = odds.get("spread_away_value")
-                existing.spread_away_odds = odds.get("spread_away_odds")
-                existing.moneyline_home_odds = odds.get("moneyline_home_odds")
-                existing.moneyline_away_odds = odds.get("moneyline_away_odds")
-                existing.total_value = odds.get("total_value")
-                existing.total_over_odds = odds.get("total_over_odds")
-                existing.total_under_odds = odds.get("total_under_odds")
-                existing.updated_at = datetime.fromisoformat(odds["updated_at"].replace('Z', '+00:00'))
+        all_odds = []
+        try:
+            # Note: v2 endpoint for odds!
+            url = f"{BALLDONTLIE_BASE_URL.replace('/v1', '/v2')}/odds"
+            async for odds in self._paginate(url, params):
+                all_odds.append(odds)
+        except httpx.HTTPError as e:
+            # Retries are exhausted; keep what was fetched and store it
+            logger.warning("⚠️  Error fetching odds: %s", e)
+        logger.info("   ✓ Got %s odds lines", len(all_odds))
         
-        db.commit()
-        print(f"✅ Synced {synced} odds records, {len(all_odds) - synced} updated")
+        synced, updated = await self._run_db(self._store_betting_odds, db, all_odds)
+        logger.info("✅ Synced %s odds records, %s updated", synced, updated)
         return synced
     
+    async def _with_new_session(self, sync):
+        """Run a sync step on its own database session (sessions can't be shared across tasks)"""
+        with get_db_context() as db:
+            return await sync(db)
+    
+    def _log_sync(self, db: Session, games_synced: int, error: Optional[str] = None):
+        """Record a daily sync run; a failed run first discards its half-written step"""
+        if error is not None:
+            db.rollback()
+        log = SyncLog(
+            sync_date=datetime.utcnow(),
+            season=2024,
+            games_synced=games_synced,
+            status="failed" if error is not None else "success",
+            error_message=error[:500] if error is not None else None
+        )
+        db.add(log)
+        db.commit()
+    
     async def perform_daily_sync(self):
         """Enhanced daily sync with GOAT tier features"""
-        print("🚀 Starting daily NBA data sync (GOAT Edition)...")
+        logger.info("🚀 Starting daily NBA data sync (GOAT Edition)...")
         
         with get_db_context() as db:
             try:
-                # 1. Sync teams (quick)
-                await self.sync_teams(db)
-                
-                # 2. Sync active players only (GOAT tier)
-                await self.sync_players(db)
-                
-                # 3. Sync yesterday's games and basic stats
-                yesterday = date.today() - timedelta(days=1)
-                games_synced = await self.sync_games_for_date_range(
-                    db, yesterday, yesterday, 2024
-                )
-                
-                # 4. GOAT TIER: Sync advanced stats for yesterday
-                await self.sync_advanced_stats_for_date_range(
-                    db, yesterday, yesterday, 2024
-                )
-                
-                # 5. GOAT TIER: Sync injuries (daily update)
-                await self.sync_player_injuries(db)
-                
-                # 6. GOAT TIER: Sync betting odds for today
-                today = date.today()
-                await self.sync_betting_odds_for_date(db, today)
-                
+                # Rows are written in explicit batches; don't let queries trigger implicit flushes
+                with db.no_autoflush:
+                    # 1-2. Sync teams and active players (GOAT tier) side by side;
+                    # the tables are independent, and each runs on its own session
+                    await asyncio.gather(
+                        self._with_new_session(self.sync_teams),
+                        self._with_new_session(self.sync_players)
+                    )
+                    
+                    # 3. Sync yesterday's games and basic stats
+                    yesterday = date.today() - timedelta(days=1)
+                    games_synced = await self.sync_games_for_date_range(
+                        db, yesterday, yesterday, 2024
+                    )
+                    
+                    # 4. GOAT TIER: Sync advanced stats for yesterday
+                    await self.sync_advanced_stats_for_date_range(
+                        db, yesterday, yesterday, 2024
+                    )
+                    
+                    # 5. GOAT TIER: Sync injuries (daily update)
+                    await self.sync_player_injuries(db)
+                    
+                    # 6. GOAT TIER: Sync betting odds for today
+                    today = date.today()
+                    await self.sync_betting_odds_for_date(db, today)
+                    
                 # Log success
-                log = SyncLog(
-                    sync_date=datetime.utcnow(),
-                    season=2024,
-                    games_synced=games_synced,
-                    status="success"
-                )
-                db.add(log)
-                db.commit()
+                await self._run_db(self._log_sync, db, games_synced)
                 
-                print("✅ Daily sync completed successfully (GOAT Edition)!")
+                logger.info("✅ Daily sync completed successfully (GOAT Edition)!")
                 return True
                 
             except Exception as e:
-                print(f"❌ Daily sync failed: {e}")
-                log = SyncLog(
-                    sync_date=datetime.utcnow(),
-                    season=2024,
-                    games_synced=0,
-                    status="failed",
-                    error_message=str(e)[:500]
-                )
-                db.add(log)
-                db.commit()
+                logger.error("❌ Daily sync failed: %s", e)
+                
+                await self._run_db(self._log_sync, db, 0, str(e))
                 return False
 
 
-async def run_daily_sync():
-    """Entry point for scheduled job"""
-    service = DataSyncService()
-    await service.perform_daily_sync()
+@contextmanager
+def daily_sync_lock():
+    """
+    Hold a PostgreSQL advisory lock while the daily sync runs
+    Yields False when another process already holds it (always True on other databases)
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    
+    with engine.connect() as connection:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": DAILY_SYNC_LOCK_KEY}).scalar()
+        # The lock belongs to the connection, so don't leave it idle in a transaction for the whole sync
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": DAILY_SYNC_LOCK_KEY})
+                connection.commit()
+
+
+def synced_today(db: Session) -> bool:
+    """Whether a daily sync has already succeeded today (UTC)"""
+    start_of_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return db.query(SyncLog.id).filter(
+        SyncLog.status == "success",
+        SyncLog.sync_date >= start_of_day
+    ).first() is not None
+
+
+async def run_daily_sync(rate_limiter: Optional[TokenBucket] = None, force: bool = False):
+    """
+    Entry point for scheduled job
+    Every web replica schedules it, so only one process runs it at a time,
+    and it's skipped once a run has succeeded today unless forced
+    """
+    with daily_sync_lock() as acquired:
+        if not acquired:
+            logger.info("⏭️  Daily sync already running in another process, skipping")
+            return
+        
+        if not force:
+            with get_db_context() as db:
+                already_synced = synced_today(db)
+            if already_synced:
+                logger.info("⏭️  Daily sync already completed today, skipping")
+                return
+        
+        async with DataSyncService(rate_limiter=rate_limiter) as service:
+            await service.perform_daily_sync()
 
 
 if __name__ == "__main__":
-    # Can be run manually for testing
-    asyncio.run(run_daily_sync())
+    # Can be run manually for testing (pass --force to sync again after today's run)
+    start_log_listener()
+    asyncio.run(run_daily_sync(force="--force" in sys.argv))
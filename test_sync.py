@@ -127,14 +127,13 @@ async def test_minimal_sync():
         from sync_service import DataSyncService
         from db_session import get_db_context
         
-        service = DataSyncService()
-        
-        with get_db_context() as db:
-            print("\n🏀 Syncing teams...")
-            teams_synced = await service.sync_teams(db)
-            print(f"✅ Teams sync complete: {teams_synced} teams")
-            
-            return True
+        async with DataSyncService() as service:
+            with get_db_context() as db:
+                print("\n🏀 Syncing teams...")
+                teams_synced = await service.sync_teams(db)
+                print(f"✅ Teams sync complete: {teams_synced} teams")
+                
+                return True
             
     except Exception as e:
         print(f"❌ Sync test failed: {e}")
@@ -176,4 +175,6 @@ async def main():
         print("\n⚠️  Some tests failed. Check the errors above.")
 
 if __name__ == "__main__":
+    from sync_service import start_log_listener
+    start_log_listener()
     asyncio.run(main())